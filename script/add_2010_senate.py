@@ -2,8 +2,7 @@
 Add 2010 U.S. Senate race (Portman vs Fisher) to consolidated file
 Data source: Manual entry based on Ohio SOS official results
 """
-import pandas as pd
-from pathlib import Path
+from supplements import upsert_supplement
 
 # 2010 U.S. Senate results by county (Portman R vs Fisher D)
 # Source: Ohio Secretary of State official results
@@ -99,18 +98,8 @@ senate_2010_data = [
     ("Wyandot", 6119, 2598, 299),
 ]
 
-def add_2010_senate():
-    """Add 2010 U.S. Senate data to the consolidated file"""
-    
-    base_dir = Path(__file__).parent.parent / "data"
-    consolidated_file = base_dir / "2010__oh__general__consolidated.csv"
-    
-    # Read existing data
-    df_existing = pd.read_csv(consolidated_file)
-    print(f"Existing 2010 data: {len(df_existing)} rows")
-    print(f"Current offices: {sorted(df_existing['office'].unique())}")
-    
-    # Create Senate data rows
+def senate_2010_rows():
+    """Consolidated rows for the 2010 U.S. Senate race"""
     senate_rows = []
     for county, portman_votes, fisher_votes, other_votes in senate_2010_data:
         # Portman (R)
@@ -141,23 +130,11 @@ def add_2010_senate():
                 'candidate': 'Other',
                 'votes': other_votes
             })
-    
-    # Create DataFrame
-    df_senate = pd.DataFrame(senate_rows)
-    
-    # Combine with existing data
-    df_combined = pd.concat([df_existing, df_senate], ignore_index=True)
-    
-    # Sort by office, county, votes
-    df_combined = df_combined.sort_values(['office', 'county', 'votes'], ascending=[True, True, False])
-    
-    # Save back
-    df_combined.to_csv(consolidated_file, index=False)
-    
-    print(f"\nAdded {len(df_senate)} U.S. Senate rows")
-    print(f"Total rows now: {len(df_combined)}")
-    print(f"Updated offices: {sorted(df_combined['office'].unique())}")
-    print(f"\nSaved to: {consolidated_file}")
+    return senate_rows
+
+def add_2010_senate():
+    """Upsert 2010 U.S. Senate data into the consolidated file (safe to re-run)"""
+    return upsert_supplement('2010', senate_2010_rows(), name='2010 U.S. Senate')
 
 if __name__ == "__main__":
     add_2010_senate()
@@ -0,0 +1,271 @@
+"""
+Benchmark the election data pipeline on synthetic multi-year inputs
+
+Generates Ohio SOS canvass CSVs and OpenElections precinct CSVs at a configurable
+scale, then times each pipeline stage and records its peak traced memory.
+Results are printed (or written) as JSON so runs can be compared across commits.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from convert_to_openelections import convert_ohio_sos_to_openelections
+from convert_openelections_to_consolidated import process_openelections_file
+from transform_election_data import COMPETITIVENESS_PALETTE, group_contests_by_office, process_openelections_csv
+
+# (SOS office row text, OpenElections office name)
+SYNTHETIC_OFFICES = [
+    ('President and Vice President', 'President'),
+    ('U.S. Senator', 'U.S. Senate'),
+    ('Governor and Lieutenant Governor', 'Governor'),
+    ('Attorney General', 'Attorney General'),
+    ('Auditor of State', 'State Auditor'),
+    ('Secretary of State', 'Secretary of State'),
+    ('Treasurer of State', 'State Treasurer'),
+    ('Justice of the Supreme Court', 'State Supreme Court'),
+]
+
+SYNTHETIC_PARTIES = [('D', 'DEM'), ('R', 'REP'), ('L', 'LIB'), ('G', 'GRN')]
+
+SOS_METADATA_COLUMNS = ['County Name', 'Precinct Name', 'Precinct Code', 'Region Name', 'Media Market',
+                        'Registered Voters', 'Ballots Counted', 'Official Voter Turnout']
+
+
+def synthetic_contests(contests, candidates):
+    """List of (sos_office, office, [(candidate, party_letter, party_code), ...])"""
+    result = []
+    for c in range(contests):
+        sos_office, office = SYNTHETIC_OFFICES[c % len(SYNTHETIC_OFFICES)]
+        if c >= len(SYNTHETIC_OFFICES):
+            sos_office = f"{sos_office} {c}"
+            office = f"{office} {c}"
+
+        contest_candidates = []
+        for k in range(candidates):
+            letter, code = SYNTHETIC_PARTIES[k % len(SYNTHETIC_PARTIES)]
+            contest_candidates.append((f"Candidate {c}-{k}", letter, code))
+        result.append((sos_office, office, contest_candidates))
+    return result
+
+
+def generate_year(out_dir, year, counties, precincts, contests, candidates, rng):
+    """
+    Write one synthetic year of inputs
+
+    Returns (sos_file, openelections_file, precinct_row_count)
+    """
+    contest_list = synthetic_contests(contests, candidates)
+    county_names = [f"County{i:03d}" for i in range(counties)]
+
+    sos_file = out_dir / f"{year} Synthetic Statewide.csv"
+    oe_file = out_dir / f"{year}1108__oh__general__precinct.csv"
+
+    with open(sos_file, 'w', newline='', encoding='utf-8') as sos_f, \
+            open(oe_file, 'w', newline='', encoding='utf-8') as oe_f:
+        sos = csv.writer(sos_f)
+        oe = csv.writer(oe_f)
+
+        office_row = [f"{year} Synthetic General Election Official Canvass"] + [''] * (len(SOS_METADATA_COLUMNS) - 1)
+        header = list(SOS_METADATA_COLUMNS)
+        for sos_office, _, contest_candidates in contest_list:
+            office_row += [sos_office] + [''] * (len(contest_candidates) - 1)
+            header += [f"{name} ({letter})" for name, letter, _ in contest_candidates]
+        sos.writerow(office_row)
+        sos.writerow(header)
+        oe.writerow(['county', 'precinct', 'office', 'district', 'party', 'candidate', 'votes'])
+
+        for county in county_names:
+            for p in range(precincts):
+                precinct = f"Precinct {p:04d}"
+                registered = rng.randint(500, 5000)
+                row = [county, precinct, f"{county[:3]}{p:04d}", 'Region', 'Market',
+                       registered, registered // 2, '50.00%']
+                for _, office, contest_candidates in contest_list:
+                    for name, _, code in contest_candidates:
+                        votes = rng.randint(0, registered // 2)
+                        row.append(f"{votes:,}")
+                        oe.writerow([county, precinct, office, '', code, name, votes])
+                sos.writerow(row)
+
+        sos.writerow(['Total'] + [''] * (len(header) - 1))
+
+    precinct_rows = counties * precincts * sum(len(c[2]) for c in contest_list)
+    return sos_file, oe_file, precinct_rows
+
+
+def run_stage(fn, *args):
+    """Call fn with its progress output suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def measure(stage, year, rows, fn, *args, repeat=1, trace_memory=True):
+    """
+    Time a stage (best of `repeat` runs) and optionally trace its peak memory
+
+    Returns (stage record, result of the last call)
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run_stage(fn, *args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    record = {
+        'stage': stage,
+        'year': year,
+        'rows': rows,
+        'seconds': round(best, 6),
+        'rows_per_second': round(rows / best, 1) if best > 0 else None
+    }
+
+    # Tracing slows execution, so memory is measured on a separate run
+    if trace_memory:
+        tracemalloc.start()
+        result = run_stage(fn, *args)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        record['peak_bytes'] = peak
+        record['retained_bytes'] = current
+
+    return record, result
+
+
+def write_json_output(document, output_file):
+    """JSON write stage, matching transform_all_data's formatting"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(counties=88, precincts=20, contests=6, candidates=4, years=3, seed=0,
+                  repeat=1, trace_memory=True, work_dir=None):
+    """Generate synthetic inputs, run every stage and return the benchmark report"""
+    rng = random.Random(seed)
+    stages = []
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        tmp_dir = Path(tmp)
+        results_by_year = {}
+
+        for y in range(years):
+            year = str(2000 + 2 * y)
+
+            start = time.perf_counter()
+            sos_file, oe_file, precinct_rows = generate_year(tmp_dir, year, counties, precincts,
+                                                             contests, candidates, rng)
+            stages.append({'stage': 'generate', 'year': year, 'rows': precinct_rows,
+                           'seconds': round(time.perf_counter() - start, 6),
+                           'bytes': sos_file.stat().st_size + oe_file.stat().st_size})
+
+            record, _ = measure('convert_ohio_sos_to_openelections', year, precinct_rows,
+                                convert_ohio_sos_to_openelections, sos_file, year,
+                                repeat=repeat, trace_memory=trace_memory)
+            stages.append(record)
+
+            record, df = measure('process_openelections_file', year, precinct_rows,
+                                 process_openelections_file, oe_file,
+                                 repeat=repeat, trace_memory=trace_memory)
+            stages.append(record)
+
+            consolidated_file = tmp_dir / f"{year}__oh__general__consolidated.csv"
+            df.to_csv(consolidated_file, index=False)
+
+            record, contests_out = measure('process_openelections_csv', year, precinct_rows,
+                                           process_openelections_csv, consolidated_file, year,
+                                           repeat=repeat, trace_memory=trace_memory)
+            stages.append(record)
+            results_by_year[year] = group_contests_by_office(contests_out)
+
+        document = {
+            'metadata': {'generated_date': datetime.now().strftime("%Y-%m-%d")},
+            'competitiveness_palette': COMPETITIVENESS_PALETTE,
+            'results_by_year': results_by_year
+        }
+        county_records = sum(len(c['results']) for offices in results_by_year.values()
+                             for contests_by_key in offices.values() for c in contests_by_key.values())
+        record, _ = measure('json_write', None, county_records, write_json_output, document,
+                            tmp_dir / 'ohio_election_results.json',
+                            repeat=repeat, trace_memory=trace_memory)
+        record['bytes'] = (tmp_dir / 'ohio_election_results.json').stat().st_size
+        stages.append(record)
+
+    # Per-stage totals across years
+    totals = {}
+    for record in stages:
+        total = totals.setdefault(record['stage'], {'rows': 0, 'seconds': 0.0, 'peak_bytes': 0})
+        total['rows'] += record['rows']
+        total['seconds'] += record['seconds']
+        total['peak_bytes'] = max(total['peak_bytes'], record.get('peak_bytes', 0))
+    for total in totals.values():
+        total['seconds'] = round(total['seconds'], 6)
+        total['rows_per_second'] = round(total['rows'] / total['seconds'], 1) if total['seconds'] > 0 else None
+
+    return {
+        'benchmark': 'pipeline',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'scale': {
+            'counties': counties,
+            'precincts_per_county': precincts,
+            'contests': contests,
+            'candidates_per_contest': candidates,
+            'years': years,
+            'seed': seed,
+            'repeat': repeat
+        },
+        'stages': stages,
+        'totals': totals
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the election pipeline on synthetic data")
+    parser.add_argument('--counties', type=int, default=88)
+    parser.add_argument('--precincts', type=int, default=20, help="Precincts per county")
+    parser.add_argument('--contests', type=int, default=6)
+    parser.add_argument('--candidates', type=int, default=4, help="Candidates per contest")
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per stage (best is reported)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--output', type=Path, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmark(counties=args.counties, precincts=args.precincts, contests=args.contests,
+                           candidates=args.candidates, years=args.years, seed=args.seed,
+                           repeat=args.repeat, trace_memory=not args.no_memory)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark report saved to: {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
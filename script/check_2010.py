@@ -1,6 +1,6 @@
-import pandas as pd
+from consolidated import load_consolidated
 
-df = pd.read_csv('data/2010__oh__general__consolidated.csv')
+df = load_consolidated('2010')
 
 statewide = ['Attorney General', 'Auditor of State', 'Governor/Lieutenant Governor', 
              'Secretary of State', 'Treasurer of State', 'U.S. Senate']
@@ -8,8 +8,8 @@ statewide = ['Attorney General', 'Auditor of State', 'Governor/Lieutenant Govern
 for office in statewide:
     office_df = df[df['office'] == office]
     print(f'{office}: {len(office_df)} rows, {office_df["county"].nunique()} counties')
-    parties = office_df['party'].value_counts().to_dict()
-    print(f'  Parties: {parties}')
+    parties = office_df['party'].value_counts()
+    print(f'  Parties: {parties[parties > 0].to_dict()}')
     if len(office_df) > 0:
         print(f'  Sample candidates: {office_df["candidate"].unique()[:5].tolist()}')
     print()
@@ -0,0 +1,156 @@
+"""
+Columnar encoding of the nested Ohio election results JSON
+
+Each contest is stored as parallel integer arrays indexed into shared county,
+candidate and competitiveness-code dictionaries instead of one dict per county.
+expand_columnar_results() rebuilds the nested ohio_election_results.json shape.
+"""
+import json
+from pathlib import Path
+
+COLUMNAR_FORMAT = "ohio-columnar-v1"
+
+# Integer columns copied straight from each county record
+VOTE_COLUMNS = ['dem_votes', 'rep_votes', 'other_votes', 'total_votes', 'margin']
+
+
+class _Dictionary:
+    """Assigns stable integer codes to values in first-seen order"""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+
+def encode_contest(contest, counties, candidates, codes):
+    """Encode one contest's county results as parallel arrays"""
+    results = contest['results'].values()
+
+    encoded = {
+        'contest_name': contest['contest_name'],
+        'office': contest['office'],
+        'district': contest['district'],
+        'county': [counties.code(r['county']) for r in results],
+        'dem_candidate': [candidates.code(r['dem_candidate']) for r in results],
+        'rep_candidate': [candidates.code(r['rep_candidate']) for r in results],
+    }
+    for column in VOTE_COLUMNS:
+        encoded[column] = [r[column] for r in results]
+
+    # margin_pct is already rounded to 2 decimals, so hundredths are exact integers
+    encoded['margin_pct_x100'] = [int(round(r['margin_pct'] * 100)) for r in results]
+    encoded['competitiveness'] = [codes.code(r['competitiveness']) for r in results]
+
+    return encoded
+
+
+def encode_results(document):
+    """Convert a nested results document into the columnar layout"""
+    all_counties = sorted({
+        county
+        for office_groups in document['results_by_year'].values()
+        for contests in office_groups.values()
+        for contest in contests.values()
+        for county in contest['results']
+    })
+    counties = _Dictionary(all_counties)
+    candidates = _Dictionary()
+    codes = _Dictionary(document['competitiveness_palette'])
+
+    results_by_year = {}
+    for year, office_groups in document['results_by_year'].items():
+        results_by_year[year] = {
+            office: {
+                contest_key: encode_contest(contest, counties, candidates, codes)
+                for contest_key, contest in contests.items()
+            }
+            for office, contests in office_groups.items()
+        }
+
+    return {
+        'format': COLUMNAR_FORMAT,
+        'metadata': document['metadata'],
+        'competitiveness_palette': document['competitiveness_palette'],
+        'counties': counties.values,
+        'candidates': candidates.values,
+        'competitiveness_codes': codes.values,
+        'results_by_year': results_by_year
+    }
+
+
+def expand_contest(encoded, year, contest_key, counties, candidates, codes):
+    """Rebuild the per-county results dict of one contest"""
+    results = {}
+    for i, county_idx in enumerate(encoded['county']):
+        county = counties[county_idx]
+        dem_votes = encoded['dem_votes'][i]
+        rep_votes = encoded['rep_votes'][i]
+        results[county] = {
+            'county': county,
+            'contest': contest_key,
+            'year': year,
+            'dem_candidate': candidates[encoded['dem_candidate'][i]],
+            'rep_candidate': candidates[encoded['rep_candidate'][i]],
+            'dem_votes': dem_votes,
+            'rep_votes': rep_votes,
+            'other_votes': encoded['other_votes'][i],
+            'total_votes': encoded['total_votes'][i],
+            'two_party_total': dem_votes + rep_votes,
+            'margin': encoded['margin'][i],
+            'margin_pct': encoded['margin_pct_x100'][i] / 100,
+            'winner': 'REP' if rep_votes > dem_votes else 'DEM',
+            'competitiveness': codes[encoded['competitiveness'][i]]
+        }
+
+    return {
+        'contest_name': encoded['contest_name'],
+        'office': encoded['office'],
+        'district': encoded['district'],
+        'results': results
+    }
+
+
+def expand_columnar_results(columnar):
+    """Expand a columnar document back into the nested ohio_election_results.json shape"""
+    if columnar.get('format') != COLUMNAR_FORMAT:
+        raise ValueError(f"Unsupported columnar format: {columnar.get('format')}")
+
+    counties = columnar['counties']
+    candidates = columnar['candidates']
+    codes = columnar['competitiveness_codes']
+
+    results_by_year = {}
+    for year, office_groups in columnar['results_by_year'].items():
+        results_by_year[year] = {
+            office: {
+                contest_key: expand_contest(encoded, year, contest_key, counties, candidates, codes)
+                for contest_key, encoded in contests.items()
+            }
+            for office, contests in office_groups.items()
+        }
+
+    return {
+        'metadata': columnar['metadata'],
+        'competitiveness_palette': columnar['competitiveness_palette'],
+        'results_by_year': results_by_year
+    }
+
+
+def write_columnar_results(document, output_file):
+    """Write the columnar form of a nested results document"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(encode_results(document), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def read_columnar_results(input_file):
+    """Read a columnar results file and expand it to the nested shape"""
+    with open(Path(input_file), 'r', encoding='utf-8') as f:
+        return expand_columnar_results(json.load(f))
@@ -0,0 +1,119 @@
+"""
+Shared reader and writer for {year}__oh__general__consolidated.csv files
+
+read_consolidated() returns a typed frame: county, office, party and candidate
+are categoricals, votes are int32 and party codes are normalized to DEM/REP.
+Parsed frames are cached per file (keyed on size and mtime), so scripts that
+read the same year more than once only parse it once. write_consolidated()
+also writes the year to the binary store in consolidated_store.py, which
+later reads use instead of parsing the CSV.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from consolidated_store import partition_is_current, read_partition, read_stats, write_partition
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+CONSOLIDATED_COLUMNS = ['county', 'office', 'district', 'party', 'candidate', 'votes']
+
+CATEGORICAL_COLUMNS = ['county', 'office', 'party', 'candidate']
+
+# Standardize party codes
+PARTY_CODES = {
+    'R': 'REP',
+    'D': 'DEM',
+    'Republican': 'REP',
+    'Democratic': 'DEM',
+    'Democrat': 'DEM',
+    'DEM': 'DEM',
+    'REP': 'REP'
+}
+
+
+def consolidated_path(year, base_dir=DATA_DIR):
+    return Path(base_dir) / f"{year}__oh__general__consolidated.csv"
+
+
+def remap_categories(values, mapping):
+    """Apply a value mapping to a categorical by rewriting its categories, merging duplicates"""
+    categories = values.cat.categories
+    inverse, merged = pd.factorize(pd.Index([mapping.get(c, c) for c in categories]))
+    codes = values.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, inverse[codes], -1) if len(categories) else codes
+    return pd.Series(pd.Categorical.from_codes(codes, categories=merged), index=values.index, name=values.name)
+
+
+def year_from_path(file_path):
+    """Year of a consolidated file from its name, or None"""
+    match = re.match(r'^(\d{4})__oh__general__consolidated\.csv$', Path(file_path).name)
+    return match.group(1) if match else None
+
+
+def parse_consolidated_csv(path):
+    """Typed frame straight from the CSV, without party normalization"""
+    df = pd.read_csv(path, dtype={column: 'category' for column in CATEGORICAL_COLUMNS})
+    df['votes'] = pd.to_numeric(df['votes'], errors='coerce').fillna(0).astype(np.int32)
+    return df
+
+
+@lru_cache(maxsize=32)
+def _read_cached(path, size, mtime_ns, normalize_parties):
+    # Prefer the binary partition when it was built from this exact CSV
+    year = year_from_path(path)
+    stats = read_stats(year, path.parent) if year else None
+    if stats is not None and partition_is_current(stats, path):
+        df = read_partition(year, base_dir=path.parent, stats=stats)
+    else:
+        df = parse_consolidated_csv(path)
+
+    # Categories are sorted, so ordering makes min()/max() on names alphabetical
+    df['candidate'] = df['candidate'].cat.as_ordered()
+    if normalize_parties:
+        df['party'] = remap_categories(df['party'], PARTY_CODES)
+    return df
+
+
+def read_consolidated(file_path, normalize_parties=True):
+    """
+    Read a consolidated CSV as a typed frame
+
+    Reads the year's binary partition instead when it is up to date with the
+    CSV. The parsed frame is shared between callers, so a shallow copy is
+    returned: assigning columns is fine, modifying values in place is not.
+    """
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    return _read_cached(path, stat.st_size, stat.st_mtime_ns, normalize_parties).copy(deep=False)
+
+
+def load_consolidated(year, base_dir=DATA_DIR, normalize_parties=True):
+    """Typed frame for one year's consolidated file"""
+    return read_consolidated(consolidated_path(year, base_dir), normalize_parties)
+
+
+def write_consolidated(df, output_file, year=None):
+    """
+    Write consolidated rows sorted by office, county and votes (highest first)
+
+    With a year, the CSV is also written as that year's binary partition.
+    """
+    df = df.sort_values(['office', 'county', 'votes'], ascending=[True, True, False])
+    df.to_csv(output_file, index=False)
+    if year is not None:
+        write_partition(parse_consolidated_csv(output_file), year, output_file, base_dir=Path(output_file).parent)
+    return df
+
+
+def build_partitions(base_dir=DATA_DIR):
+    """Write a binary partition for every consolidated CSV"""
+    for csv_file in sorted(Path(base_dir).glob("*__oh__general__consolidated.csv")):
+        year = year_from_path(csv_file)
+        if year is None:
+            continue
+        stats = write_partition(parse_consolidated_csv(csv_file), year, csv_file, base_dir=base_dir)
+        print(f"  ✓ {year}: {stats['rows']:,} rows, {len(stats['offices'])} offices")
@@ -0,0 +1,218 @@
+"""
+Year-partitioned binary columnar copy of the consolidated results
+
+Each year is stored as data/consolidated/year=<year>/data.npz with one array
+per column (text columns as int32 dictionary codes plus a value table, votes
+as int32) and a _stats.json sidecar holding the schema, row count, vote
+statistics and the offices present. Queries prune partitions by year and
+office from the sidecars and load only the columns they ask for.
+
+The consolidated CSVs remain the compatibility output; a partition records
+the size and mtime of the CSV it was built from and is ignored once that CSV
+changes.
+"""
+import argparse
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+STORE_FORMAT = "ohio-consolidated-v1"
+
+# Text columns stored as dictionary codes and decoded as categoricals. Other
+# columns (district, and extras such as pct) keep the dtype read_csv gave them.
+DICTIONARY_COLUMNS = ['county', 'office', 'party', 'candidate']
+
+
+def store_dir(base_dir=DATA_DIR):
+    return Path(base_dir) / "consolidated"
+
+
+def partition_dir(year, base_dir=DATA_DIR):
+    return store_dir(base_dir) / f"year={year}"
+
+
+def encode_partition(df):
+    """Column arrays and schema (in column order) for one year's typed frame"""
+    arrays = {}
+    schema = {}
+    for column in df.columns:
+        values = df[column]
+        if column == 'votes':
+            arrays[column] = values.to_numpy(dtype=np.int32)
+            schema[column] = 'int32'
+        elif column in DICTIONARY_COLUMNS or values.dtype == object or pd.api.types.is_string_dtype(values):
+            # 'string' columns are decoded back to plain objects rather than categoricals
+            categorical = pd.Categorical(values.astype(object))
+            arrays[f'{column}_codes'] = categorical.codes.astype(np.int32)
+            arrays[f'{column}_values'] = np.asarray(categorical.categories, dtype=str)
+            schema[column] = 'dictionary' if column in DICTIONARY_COLUMNS else 'string'
+        else:
+            arrays[column] = values.to_numpy()
+            schema[column] = str(values.dtype)
+    return arrays, schema
+
+
+def decode_column(data, column, column_type, mask=None):
+    """Rebuild one column from a loaded partition, optionally keeping only mask rows"""
+    if column_type in ('dictionary', 'string'):
+        codes = data[f'{column}_codes']
+        if mask is not None:
+            codes = codes[mask]
+        categorical = pd.Categorical.from_codes(codes, categories=pd.Index(data[f'{column}_values'], dtype=object))
+        if column_type == 'dictionary':
+            return categorical
+        return pd.Series(categorical).astype(object).to_numpy()
+    values = data[column]
+    return values[mask] if mask is not None else values
+
+
+def write_partition(df, year, source_file, base_dir=DATA_DIR):
+    """
+    Write one year's typed frame as a partition
+
+    df should be the frame read back from source_file, so a partition and its
+    CSV always decode to the same values.
+    """
+    arrays, schema = encode_partition(df)
+    arrays['format'] = np.array(STORE_FORMAT)
+
+    out_dir = partition_dir(year, base_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.savez(out_dir / "data.npz", **arrays)
+
+    source = Path(source_file).stat()
+    votes = df['votes']
+    stats = {
+        'format': STORE_FORMAT,
+        'year': str(year),
+        'rows': len(df),
+        'schema': schema,
+        'source': {'file': Path(source_file).name, 'size': source.st_size, 'mtime_ns': source.st_mtime_ns},
+        'votes': {'min': int(votes.min()) if len(df) else 0, 'max': int(votes.max()) if len(df) else 0,
+                  'sum': int(votes.sum())},
+        'counties': int(df['county'].nunique()),
+        'offices': sorted(df['office'].dropna().astype(str).unique().tolist())
+    }
+    with open(out_dir / "_stats.json", 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+def read_stats(year, base_dir=DATA_DIR):
+    """Stats sidecar for one partition, or None if it does not exist"""
+    stats_file = partition_dir(year, base_dir) / "_stats.json"
+    if not stats_file.exists():
+        return None
+    with open(stats_file, 'r', encoding='utf-8') as f:
+        stats = json.load(f)
+    return stats if stats.get('format') == STORE_FORMAT else None
+
+
+def partition_stats(base_dir=DATA_DIR):
+    """{year: stats} for every partition in the store"""
+    stats = {}
+    for stats_file in sorted(store_dir(base_dir).glob("year=*/_stats.json")):
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if record.get('format') == STORE_FORMAT:
+            stats[record['year']] = record
+    return stats
+
+
+def partition_is_current(stats, source_file):
+    """Whether a partition was built from the current contents of source_file"""
+    source_file = Path(source_file)
+    if not source_file.exists():
+        return False
+    stat = source_file.stat()
+    return stats['source']['size'] == stat.st_size and stats['source']['mtime_ns'] == stat.st_mtime_ns
+
+
+def read_partition(year, columns=None, offices=None, base_dir=DATA_DIR, stats=None):
+    """
+    Read one partition as a DataFrame
+
+    Only the requested columns (default: all, in CSV order) are loaded; offices
+    filters rows on the office dictionary codes before decoding.
+    """
+    if stats is None:
+        stats = read_stats(year, base_dir)
+        if stats is None:
+            raise FileNotFoundError(f"No partition for {year} in {store_dir(base_dir)}")
+    schema = stats['schema']
+    columns = list(columns or schema)
+
+    with np.load(partition_dir(year, base_dir) / "data.npz") as data:
+        mask = None
+        if offices is not None:
+            office_values = data['office_values']
+            wanted = np.flatnonzero(np.isin(office_values, list(offices)))
+            mask = np.isin(data['office_codes'], wanted)
+        return pd.DataFrame({column: decode_column(data, column, schema[column], mask) for column in columns})
+
+
+def scan(years=None, offices=None, columns=None, base_dir=DATA_DIR):
+    """
+    Rows for the given years and offices across partitions, with a year column
+
+    Partitions outside years, or whose stats show none of the offices, are not
+    opened at all.
+    """
+    stats = partition_stats(base_dir)
+    wanted_years = {str(year) for year in years} if years is not None else set(stats)
+    frames = []
+    for year in sorted(wanted_years & set(stats)):
+        if offices is not None and not set(offices) & set(stats[year]['offices']):
+            continue
+        df = read_partition(year, columns=columns, offices=offices, base_dir=base_dir, stats=stats[year])
+        frames.append(df.assign(year=year))
+
+    if not frames:
+        return pd.DataFrame(columns=list(columns or []) + ['year'])
+    df = pd.concat(frames, ignore_index=True)
+    # Per-year dictionaries differ, so re-encode text columns once for the combined frame
+    for column in DICTIONARY_COLUMNS + ['year']:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def parse_years(text):
+    """'2008-2024' or '2008,2012' -> list of year strings"""
+    years = []
+    for part in text.split(','):
+        match = re.fullmatch(r'(\d{4})(?:-(\d{4}))?', part.strip())
+        if not match:
+            raise argparse.ArgumentTypeError(f"Invalid year range: {part}")
+        start, end = int(match.group(1)), int(match.group(2) or match.group(1))
+        years.extend(str(y) for y in range(start, end + 1))
+    return years
+
+
+def main():
+    from consolidated import build_partitions
+
+    parser = argparse.ArgumentParser(description="Build or query the year-partitioned consolidated store")
+    parser.add_argument('--build', action='store_true', help="(Re)build partitions from the consolidated CSVs")
+    parser.add_argument('--years', type=parse_years, help="Years to read, e.g. 2008-2024 or 2008,2012")
+    parser.add_argument('--office', action='append', help="Office to keep (repeatable)")
+    parser.add_argument('--columns', help="Comma-separated columns to read")
+    args = parser.parse_args()
+
+    if args.build:
+        build_partitions()
+        return
+
+    columns = args.columns.split(',') if args.columns else None
+    df = scan(years=args.years, offices=args.office, columns=columns)
+    print(df.to_string(max_rows=20))
+    print(f"\n{len(df):,} rows from years: {sorted(df['year'].unique().tolist()) if len(df) else []}")
+
+
+if __name__ == "__main__":
+    main()
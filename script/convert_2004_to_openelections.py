@@ -3,11 +3,82 @@ Convert 2004 Ohio election data to OpenElections format
 Merges the Candidate Name List with Election Results
 """
 import pandas as pd
+import argparse
 from pathlib import Path
 
-def convert_2004_to_openelections():
+from consolidated import write_consolidated
+from pipeline_trace import stage
+from precinct_store import write_precinct_store
+
+# Standardized names for the canvass office titles
+OFFICE_NAMES = {
+    'President/Vice President': 'President',
+    'U.S. Senate': 'U.S. Senate',
+    'U.S. Representative': 'U.S. House',
+    'State Senator': 'State Senate',
+    'State Representative': 'State House',
+    'Board of Education': 'State Board of Education',
+}
+
+PARTY_CODES = {'D': 'DEM', 'R': 'REP'}
+
+# County names that title-casing gets wrong
+COUNTY_NAME_FIXES = {'Vanwert': 'Van Wert'}
+
+
+def standardize_office(office):
+    """OpenElections office name for a 2004 canvass office title"""
+    if office in OFFICE_NAMES:
+        return OFFICE_NAMES[office]
+    if 'Justice of the Supreme Court' in office or 'Chief Justice' in office:
+        return 'State Supreme Court'
+    if 'Court of Appeals' in office:
+        return 'Court of Appeals'
+    return office
+
+
+def build_candidate_table(candidates_df, result_columns):
+    """
+    One row per results column: column, office, district, party, candidate
+
+    When several candidates list the same data column the last one wins, as
+    the column mapping has always behaved.
+    """
+    table = candidates_df.dropna(subset=['Data Column Name', 'Candidate Name'])
+    table = table.drop_duplicates(subset='Data Column Name', keep='last')
+    table = table[table['Data Column Name'].isin(result_columns)]
+    
+    district = table['District']
+    return pd.DataFrame({
+        'column': table['Data Column Name'],
+        'office': table['Office '].str.strip().map(standardize_office),
+        'district': district.astype('Int64').astype(str).where(district.notna(), ''),
+        'party': table['Party'].map(PARTY_CODES).fillna('IND'),
+        'candidate': table['Candidate Name'].astype(str).str.strip()
+    }).reset_index(drop=True)
+
+
+def parse_vote_column(values):
+    """Integer votes for a results column; blanks and unparseable cells count as 0"""
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype('int64')
+    cleaned = values.astype(object).astype(str).str.replace(',', '', regex=False).str.strip()
+    cleaned = cleaned.where(values.notna() & cleaned.str.fullmatch(r'[+-]?\d+'))
+    return pd.to_numeric(cleaned).fillna(0).astype('int64')
+
+
+def join_candidates(votes, candidate_table, *index_names):
+    """Reshape a wide votes frame (one column per data column) into candidate rows"""
+    long = votes.rename_axis(list(index_names)).rename_axis(columns='column').stack().rename('votes')
+    long = long.reset_index().merge(candidate_table, on='column', how='left', sort=False)
+    return long[list(index_names) + ['office', 'district', 'party', 'candidate', 'votes']]
+
+
+def convert_2004_to_openelections(precincts=False):
     """
     Convert 2004 Ohio data to OpenElections format
+    
+    With precincts=True, precinct-level rows are also saved to data/precincts/2004.npz
     """
     
     base_dir = Path(__file__).parent.parent / "data"
@@ -17,110 +88,55 @@ def convert_2004_to_openelections():
     results_file = base_dir / "2004 Election Results.csv"
     
     print(f"Reading {candidates_file.name}...")
-    candidates_df = pd.read_csv(candidates_file)
+    with stage('read_csv', file=candidates_file) as step:
+        candidates_df = pd.read_csv(candidates_file)
+        step['rows'] = len(candidates_df)
     
     print(f"Reading {results_file.name}...")
     # Read with skiprows to skip the first header line
-    results_df = pd.read_csv(results_file, skiprows=1)
+    with stage('read_csv', file=results_file) as step:
+        results_df = pd.read_csv(results_file, skiprows=1)
+        step['rows'] = len(results_df)
     
     # Create mapping of column names to candidate info
-    column_mapping = {}
-    for _, row in candidates_df.iterrows():
-        col_name = row['Data Column Name']
-        
-        # Skip if missing required fields
-        if pd.isna(col_name) or pd.isna(row['Candidate Name']):
-            continue
-        
-        office = row['Office '].strip()
-        district = row['District'] if pd.notna(row['District']) else None
-        party_code = row['Party']
-        candidate = str(row['Candidate Name']).strip()
-        
-        # Map party codes
-        party = 'DEM' if party_code == 'D' else 'REP' if party_code == 'R' else 'IND'
-        
-        # Standardize office names
-        if office == 'President/Vice President':
-            office_name = 'President'
-        elif office == 'U.S. Senate':
-            office_name = 'U.S. Senate'
-        elif office == 'U.S. Representative':
-            office_name = 'U.S. House'
-        elif office == 'State Senator':
-            office_name = 'State Senate'
-        elif office == 'State Representative':
-            office_name = 'State House'
-        elif office == 'Board of Education':
-            office_name = 'State Board of Education'
-        elif 'Justice of the Supreme Court' in office or 'Chief Justice' in office:
-            office_name = 'State Supreme Court'
-        elif 'Court of Appeals' in office:
-            office_name = 'Court of Appeals'
-        else:
-            office_name = office
-        
-        column_mapping[col_name] = {
-            'office': office_name,
-            'district': str(int(district)) if pd.notna(district) else '',
-            'party': party,
-            'candidate': candidate
-        }
-    
-    # Process results
-    openelections_rows = []
+    with stage('map_candidates', file=candidates_file) as step:
+        candidate_table = build_candidate_table(candidates_df, results_df.columns)
+        step['rows'] = len(candidate_table)
     
     print("\nProcessing results...")
-    for _, row in results_df.iterrows():
-        county_name = row['COUNTY NAME']
+    with stage('parse_votes', file=results_file) as step:
+        county_names = results_df['COUNTY NAME']
         
         # Skip total/summary rows
-        if pd.isna(county_name) or not county_name.strip():
-            continue
-        
-        county_name = county_name.strip().title()
+        keep = county_names.notna() & (county_names.str.strip() != '')
+        results_df = results_df[keep]
         
         # Fix Van Wert county name (appears as VANWERT in source)
-        if county_name == 'Vanwert':
-            county_name = 'Van Wert'
+        counties = results_df['COUNTY NAME'].str.strip().str.title().replace(COUNTY_NAME_FIXES)
         
-        # Process each candidate column
-        for col_name, candidate_info in column_mapping.items():
-            if col_name not in results_df.columns:
-                continue
-            
-            votes = row[col_name]
-            
-            # Skip if no votes or invalid value
-            if pd.isna(votes) or votes == '':
-                votes = 0
-            else:
-                try:
-                    votes = int(str(votes).replace(',', '').strip())
-                except:
-                    votes = 0
-            
-            openelections_rows.append({
-                'county': county_name,
-                'office': candidate_info['office'],
-                'district': candidate_info['district'],
-                'party': candidate_info['party'],
-                'candidate': candidate_info['candidate'],
-                'votes': votes
-            })
+        vote_columns = candidate_table['column'].tolist()
+        votes = pd.DataFrame({col: parse_vote_column(results_df[col]) for col in vote_columns},
+                             index=results_df.index)
+        step['rows'] = votes.size
     
     # Aggregate by county (sum votes across precincts)
     print("\nAggregating by county...")
-    df = pd.DataFrame(openelections_rows)
-    
-    grouped = df.groupby(['county', 'office', 'district', 'party', 'candidate'], as_index=False)['votes'].sum()
+    with stage('aggregate_counties', rows=votes.size):
+        county_votes = votes.groupby(counties.to_numpy()).sum()
+        grouped = join_candidates(county_votes, candidate_table, 'county')
+        grouped = grouped.groupby(['county', 'office', 'district', 'party', 'candidate'], as_index=False)['votes'].sum()
     
-    # Sort by office, county, votes
-    grouped = grouped.sort_values(['office', 'county', 'votes'], ascending=[True, True, False])
+    if precincts:
+        with stage('expand_precinct_rows', file=results_file, rows=votes.size):
+            precinct_names = results_df['PRECINCT NAME'].astype(object).astype(str).str.strip()
+            precinct_votes = votes.set_index([counties.to_numpy(), precinct_names.to_numpy()])
+            df = join_candidates(precinct_votes, candidate_table, 'county', 'precinct')
+        write_precinct_store(df, base_dir / "precincts" / "2004.npz")
     
     # Save consolidated file
     output_file = base_dir / "2004__oh__general__consolidated.csv"
-    grouped.to_csv(output_file, index=False)
+    with stage('write_consolidated', file=output_file, rows=len(grouped)):
+        grouped = write_consolidated(grouped, output_file, '2004')
     
     print(f"\n✓ Saved consolidated 2004 data to: {output_file.name}")
     print(f"  Total rows: {len(grouped):,}")
@@ -134,4 +150,8 @@ def convert_2004_to_openelections():
     return grouped
 
 if __name__ == "__main__":
-    convert_2004_to_openelections()
+    parser = argparse.ArgumentParser(description="Convert the 2004 Ohio SOS files to OpenElections format")
+    parser.add_argument('--precincts', action='store_true', help="Also write a precinct-level store to data/precincts/2004.npz")
+    args = parser.parse_args()
+    
+    convert_2004_to_openelections(precincts=args.precincts)
@@ -1,10 +1,120 @@
 """
 Convert existing OpenElections format CSV files to consolidated format
 """
+import hashlib
 import pandas as pd
 import re
 from pathlib import Path
 
+from consolidated import write_consolidated
+from pipeline_trace import stage
+
+
+# Known 2010 Ohio candidates, used when a file has no party column
+PARTY_LOOKUP = {
+    # Governor
+    'Kasich, John': 'REP',
+    'Strickland, Ted': 'DEM',
+    # U.S. Senate
+    'Portman, Rob': 'REP',
+    'Fisher, Lee': 'DEM',
+    # Attorney General
+    'DeWine, Mike': 'REP',
+    'Cordray, Richard': 'DEM',
+    # Auditor
+    'Yost, Dave': 'REP',
+    'Pepper, David': 'DEM',
+    # Secretary of State
+    'Husted, Jon': 'REP',
+    "O'Shaughnessy, Maryellen": 'DEM',
+    # Treasurer
+    'Mandel, Josh': 'REP',
+    'Boyce, Kevin': 'DEM',
+}
+
+# Text columns are read as strings; votes are coerced after reading because
+# some files carry blanks or stray text in the votes column
+TEXT_COLUMNS = ['county', 'office', 'party', 'candidate']
+
+# Detected schemas keyed by header signature, shared by every file in a run
+_schema_cache = {}
+
+
+def header_signature(columns):
+    """Stable hash of a CSV header"""
+    return hashlib.sha1('\x1f'.join(columns).encode('utf-8')).hexdigest()
+
+
+def detect_schema(columns):
+    """
+    Map a CSV header to the consolidated columns
+
+    Returns a dict with 'mapping' (source column -> standard name), 'usecols'
+    (source columns to parse) and 'dtype' (read_csv dtype hints), or
+    {'missing': [...]} if a required column is missing. Results are memoized
+    by header signature.
+    """
+    signature = header_signature(columns)
+    if signature in _schema_cache:
+        return _schema_cache[signature]
+
+    column_mapping = {}
+    for col in columns:
+        col_lower = col.lower()
+        # Use elif to prevent matching multiple conditions
+        if 'county' in col_lower and col not in column_mapping.values():
+            column_mapping[col] = 'county'
+        elif 'office' in col_lower and col not in column_mapping.values():
+            column_mapping[col] = 'office'
+        elif col_lower == 'district' and col not in column_mapping.values():
+            column_mapping[col] = 'district'
+        elif 'party' in col_lower and col not in column_mapping.values():
+            column_mapping[col] = 'party'
+        elif 'candidate' in col_lower and col not in column_mapping.values():
+            column_mapping[col] = 'candidate'
+        elif 'vote' in col_lower and 'registered' not in col_lower and col not in column_mapping.values():
+            column_mapping[col] = 'votes'
+
+    # Party is optional (inferred if missing), district is filled in if missing
+    required_cols = ['county', 'office', 'candidate', 'votes']
+    missing = [col for col in required_cols if col not in column_mapping.values()]
+
+    if missing:
+        schema = {'missing': missing}
+    else:
+        schema = {
+            'mapping': column_mapping,
+            'usecols': list(column_mapping),
+            'dtype': {col: str for col, name in column_mapping.items() if name in TEXT_COLUMNS},
+        }
+
+    _schema_cache[signature] = schema
+    return schema
+
+
+def clean_openelections_frame(df):
+    """Normalize a renamed OpenElections frame in one pass over its columns"""
+    if 'district' not in df.columns:
+        df['district'] = ''
+
+    if 'party' not in df.columns:
+        print(f"    INFO: Party column missing - will infer from candidate names")
+        party = df['candidate'].map(PARTY_LOOKUP).fillna('')
+    else:
+        party = df['party'].fillna('').str.strip()
+
+    county = df['county'].str.strip()
+    df = df.assign(
+        county=county,
+        office=df['office'].str.strip(),
+        party=party,
+        candidate=df['candidate'].fillna('Unknown').str.strip(),
+        votes=pd.to_numeric(df['votes'], errors='coerce').fillna(0).astype(int)
+    )
+
+    # Remove any rows with missing essential data
+    return df[county.notna() & (county != '') & (county != 'nan')]
+
 
 def process_openelections_file(file_path):
     """
@@ -15,100 +125,22 @@ def process_openelections_file(file_path):
     print(f"\n  Processing: {file_path.name}")
     
     try:
-        # Read the CSV
-        df = pd.read_csv(file_path)
-        
-        # Check columns
-        print(f"    Columns ({len(df.columns)} total): {df.columns.tolist()}")
-        
-        # Standardize column names if needed
-        column_mapping = {}
-        for col in df.columns:
-            col_lower = col.lower()
-            # Use elif to prevent matching multiple conditions
-            if 'county' in col_lower and col not in column_mapping.values():
-                column_mapping[col] = 'county'
-            elif 'office' in col_lower and col not in column_mapping.values():
-                column_mapping[col] = 'office'
-            elif col_lower == 'district' and col not in column_mapping.values():
-                column_mapping[col] = 'district'
-            elif 'party' in col_lower and col not in column_mapping.values():
-                column_mapping[col] = 'party'
-            elif 'candidate' in col_lower and col not in column_mapping.values():
-                column_mapping[col] = 'candidate'
-            elif 'vote' in col_lower and 'registered' not in col_lower and col not in column_mapping.values():
-                column_mapping[col] = 'votes'
-        
-        if column_mapping:
-            df = df.rename(columns=column_mapping)
-        
-        # Ensure required columns exist (party is optional, will be inferred if missing)
-        required_cols = ['county', 'office', 'candidate', 'votes']
-        missing = [col for col in required_cols if col not in df.columns]
-        
-        if missing:
-            print(f"    ⚠ Missing columns: {missing}")
-            return None
-        
-        # Add district column if missing
-        if 'district' not in df.columns:
-            df['district'] = ''
-        
-        # Add party column if missing - we'll infer from known candidates
-        if 'party' not in df.columns:
-            print(f"    INFO: Party column missing - will infer from candidate names")
-            df['party'] = ''
-            
-            # Known 2010 Ohio candidates
-            party_lookup = {
-                # Governor
-                'Kasich, John': 'REP',
-                'Strickland, Ted': 'DEM',
-                # U.S. Senate
-                'Portman, Rob': 'REP',
-                'Fisher, Lee': 'DEM',
-                # Attorney General
-                'DeWine, Mike': 'REP',
-                'Cordray, Richard': 'DEM',
-                # Auditor
-                'Yost, Dave': 'REP',
-                'Pepper, David': 'DEM',
-                # Secretary of State
-                'Husted, Jon': 'REP',
-                "O'Shaughnessy, Maryellen": 'DEM',
-                # Treasurer
-                'Mandel, Josh': 'REP',
-                'Boyce, Kevin': 'DEM',
-            }
-            
-            for candidate, party in party_lookup.items():
-                df.loc[df['candidate'] == candidate, 'party'] = party
-        
-        # Clean up data
-        df['county'] = df['county'].astype(str).str.strip()
-        df['office'] = df['office'].astype(str).str.strip()
-        
-        # Handle votes column more carefully - might be object type in some files
-        if 'votes' in df.columns:
-            votes_col = df['votes']
-            # First try to convert, coercing errors to NaN
-            df['votes'] = pd.to_numeric(votes_col, errors='coerce')
-            # Fill NaN with 0 and convert to int
-            df['votes'] = df['votes'].fillna(0).astype(int)
-        else:
-            print(f"    ERROR: votes column not found. Available: {df.columns.tolist()}")
+        # Only the header is needed to pick the columns and dtypes
+        columns = pd.read_csv(file_path, nrows=0).columns.tolist()
+        print(f"    Columns ({len(columns)} total): {columns}")
+
+        schema = detect_schema(tuple(columns))
+        if 'missing' in schema:
+            print(f"    ⚠ Missing columns: {schema['missing']}")
             return None
-        
-        # Ensure party is string type
-        if 'party' in df.columns:
-            df['party'] = df['party'].fillna('').astype(str).str.strip()
-        
-        # Ensure candidate is string type
-        if 'candidate' in df.columns:
-            df['candidate'] = df['candidate'].fillna('Unknown').astype(str).str.strip()
-        
-        # Remove any rows with missing essential data
-        df = df[df['county'].notna() & (df['county'] != '') & (df['county'] != 'nan')]
+
+        with stage('read_csv', file=file_path) as step:
+            df = pd.read_csv(file_path, usecols=schema['usecols'], dtype=schema['dtype'])
+            step['rows'] = len(df)
+
+        with stage('normalize_columns', file=file_path) as step:
+            df = clean_openelections_frame(df.rename(columns=schema['mapping']))
+            step['rows'] = len(df)
         
         print(f"    OK: Loaded {len(df)} rows")
         return df
@@ -154,19 +186,18 @@ def main():
     for year, dfs in years_data.items():
         # Combine all files for this year
         try:
-            combined_df = pd.concat(dfs, ignore_index=True)
+            with stage('combine_year', rows=sum(len(df) for df in dfs)):
+                combined_df = pd.concat(dfs, ignore_index=True)
         except Exception as e:
             print(f"\nERROR combining {year} data: {e}")
             import traceback
             traceback.print_exc()
             continue
         
-        # Sort by office, county, votes
-        combined_df = combined_df.sort_values(['office', 'county', 'votes'], ascending=[True, True, False])
-        
-        # Save consolidated file
+        # Save consolidated file sorted by office, county, votes
         output_file = base_dir / f"{year}__oh__general__consolidated.csv"
-        combined_df.to_csv(output_file, index=False)
+        with stage('write_consolidated', file=output_file, rows=len(combined_df)):
+            combined_df = write_consolidated(combined_df, output_file, year)
         
         print(f"\nOK: Saved {year} data to: {output_file.name}")
         print(f"  Total rows: {len(combined_df):,}")
@@ -2,11 +2,21 @@
 Convert Ohio Secretary of State aligned CSV files to OpenElections format
 """
 import pandas as pd
+import numpy as np
 import csv
 import re
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from io import StringIO
 
+from consolidated import write_consolidated
+from office_inference import infer_office
+from pipeline_trace import stage
+from precinct_store import write_precinct_store
+
 
 def parse_candidate_column(col_name):
     """Extract candidate name and party from column header"""
@@ -36,221 +46,298 @@ def parse_candidate_column(col_name):
 
 
 def infer_office_from_candidate(candidate_name, filename, year):
-    """Infer office from candidate name and filename context"""
-    
-    # Known candidates for 2022-2024 (full names to avoid partial matches)
-    governor_candidates_2022 = ['Mike DeWine and Jon Husted', 'Nan Whaley and Cheryl L. Stephens', 'Timothy Grady and Dayna Bickley', 
-                                 'Craig Patton and Collin Cook', 'Renea Turner and Adina Pelletier', 'Marshall Usher and Shannon  Walker']
-    ag_candidates_2022 = ['Jeffrey A. Crossman', 'Dave Yost']
-    auditor_candidates_2022 = ['Keith Faber', 'Taylor Sappington']
-    sos_candidates_2022 = ['Chelsea Clark', 'Frank LaRose', 'Terpsehore Tore Maras']
-    treasurer_candidates_2022 = ['Scott Schertzer', 'Robert Sprague']
-    
-    senate_candidates = {
-        '2022': ['JD Vance', 'Tim Ryan'],
-        '2024': ['Sherrod Brown', 'Bernie Moreno']
-    }
+    """Infer office from candidate name and filename context (rules in office_inference.json)"""
+    return infer_office(candidate_name, filename, year)
+
+
+# Columns before the candidate columns in SOS canvass files
+SOS_METADATA_COLUMNS = [
+    'Precinct Code', 'Region Name', 'Media Market',
+    'Registered Voters', 'Ballots Counted', 'Official Voter Turnout',
+    '']
+
+
+def open_canvass(input_file):
+    """Open an SOS canvass file for line-by-line reading"""
+    return open(input_file, 'r', encoding='utf-8', errors='ignore')
+
+
+def read_canvass_header(input_file):
+    """
+    Scan an SOS canvass file up to its "County Name / Precinct Name" header row
+    
+    Only the lines before the header are read. Returns (office_line, headers), where
+    office_line is the line just before the header (None if the header is the first
+    line), or (None, None) if no header row is found.
+    """
+    previous_line = None
+    with open_canvass(input_file) as f:
+        for line in f:
+            if 'County Name' in line and 'Precinct Name' in line:
+                headers = next(csv.reader(StringIO(line.rstrip('\n'))))
+                return previous_line, headers
+            previous_line = line.rstrip('\n')
     
-    president_candidates_2024 = ['Donald J. Trump and JD Vance', 'Kamala D. Harris and Tim Walz', 
-                                  'Robert F. Kennedy Jr. and Nicole Shanahan', 'Jill Stein and Rudolph Ware',
-                                  'Chase Oliver and Mike ter Maat', 'Cornel West and Melina Abdullah']
+    return None, None
+
+
+def iter_canvass_rows(input_file):
+    """Yield the parsed CSV rows after the header row, one at a time"""
+    with open_canvass(input_file) as f:
+        for line in f:
+            if 'County Name' in line and 'Precinct Name' in line:
+                break
+        
+        yield from csv.reader(f)
+
+
+def parse_vote_cell(cell):
+    """
+    Parse one vote cell such as '1,021'
     
-    supreme_court_candidates = {
-        '2022': ['Pat Fischer', 'Sharon L. Kennedy', 'Terri Jamison', 'Jennifer Brunner'],
-        '2024': ['Melody J. Stewart', 'Michael P. Donnelly', 'Megan E. Shanahan', 'Joseph T. Deters', 'Dan Hawkins']
-    }
+    Returns (votes, ok). Blank cells count as 0 votes; cells that are not
+    numbers return (0, False) so they can be reported.
+    """
+    try:
+        return int(cell), True
+    except ValueError:
+        pass
+    
+    cleaned = cell.replace(',', '').replace('"', '').strip()
+    if not cleaned:
+        return 0, True
+    try:
+        return int(cleaned), True
+    except ValueError:
+        return 0, False
+
+
+# Precinct rows parsed per block before the block is summed into county totals
+BLOCK_ROWS = 4096
+
+
+def read_canvass_matrix(input_file, headers, candidate_columns, keep_precincts=False, block_rows=BLOCK_ROWS):
+    """
+    Parse a canvass file's precinct rows into per-county vote totals
+    
+    Rows are parsed into a typed block of at most block_rows rows, and each block
+    is summed into the county totals with np.add.at before the next one is read,
+    so memory stays flat regardless of file size. The full precinct matrix is
+    only kept with keep_precincts=True.
+    
+    Returns a dict with:
+      counties         - county names in first-seen order
+      totals           - int64 array of shape (counties, candidate columns)
+      precinct_counts  - int array, precinct rows per county
+      malformed        - list of (data row number, county, column index, cell) that could not be parsed
+    and, with keep_precincts=True:
+      county_codes     - int array, one county index per precinct row
+      precincts        - precinct name per precinct row
+      matrix           - int64 array of shape (precincts, candidate columns)
+    """
+    col_indexes = [col_idx for col_idx, _ in candidate_columns]
+    n_cols = len(col_indexes)
+    county_index = {}
+    totals = np.zeros((0, n_cols), dtype=np.int64)
+    precinct_counts = np.zeros(0, dtype=np.int64)
+    malformed = []
     
-    # US House candidates - comprehensive list
-    house_candidates = ['Brad Wenstrup', 'Steve Chabot', 'Jim Jordan', 'Bob Latta', 'David P. Joyce', 
-                       'Mike Carey', 'Troy Balderson', 'Madison Gesiotto Gilbert', 'Bill Johnson', 'Emilia Sykes',
-                       'Max Miller', 'Shontel Brown', 'Greg Landsman', 'Warren Davidson', 'Mike Turner',
-                       'Joyce Beatty', 'Samantha Meadows', 'Matt Diemer', 'Derek Merrin', 'Marcy Kaptur']
-    
-    # Check filename hints first (most reliable)
-    if 'Supreme' in filename or 'Justice' in filename:
-        return 'State Supreme Court', ''
-    if 'President' in filename:
-        return 'President', ''
-    
-    # For Congress files, default to checking both Senate and House
-    if 'Congress' in filename:
-        # Check Senate first (exact match)
-        year_senate = senate_candidates.get(year, [])
-        for sen in year_senate:
-            if sen in candidate_name:  # Exact match
-                return 'U.S. Senate', ''
+    county_codes = array('q')
+    values = array('q')
+    kept_codes = []
+    kept_blocks = []
+    precincts = []
+    
+    def flush():
+        nonlocal totals, precinct_counts, county_codes, values
+        if not county_codes:
+            return
+        codes = np.frombuffer(county_codes, dtype=np.int64)
+        block = np.frombuffer(values, dtype=np.int64).reshape(len(codes), n_cols)
+        
+        # Grow the totals when the block introduced new counties
+        new_counties = len(county_index) - len(totals)
+        if new_counties:
+            totals = np.vstack([totals, np.zeros((new_counties, n_cols), dtype=np.int64)])
+            precinct_counts = np.concatenate([precinct_counts, np.zeros(new_counties, dtype=np.int64)])
+        np.add.at(totals, codes, block)
+        precinct_counts += np.bincount(codes, minlength=len(precinct_counts))
         
-        # Then check House candidates
-        for house in house_candidates:
-            if house in candidate_name:  # Exact match
-                return 'U.S. House', ''
+        if keep_precincts:
+            kept_codes.append(codes)
+            kept_blocks.append(block)
+        county_codes = array('q')
+        values = array('q')
+    
+    for row_number, row in enumerate(iter_canvass_rows(input_file), start=1):
+        if len(row) < len(headers):
+            continue
         
-        # Default to U.S. House for Congress files if no match
-        return 'U.S. House', ''
-    
-    # Match state offices only for midterm years (2022, 2026, etc.)
-    if year == '2022':
-        # Full name matching for ticket races
-        for gov in governor_candidates_2022:
-            if 'DeWine' in candidate_name and 'Husted' in candidate_name:
-                return 'Governor', ''
-            elif 'Whaley' in candidate_name and 'Stephens' in candidate_name:
-                return 'Governor', ''
-            elif gov in candidate_name:
-                return 'Governor', ''
+        county_name = row[0].strip() if len(row) > 0 else ''
         
-        for ag in ag_candidates_2022:
-            if ag in candidate_name:  # Exact match
-                return 'Attorney General', ''
+        # Skip summary rows
+        if not county_name or county_name in ['Total', 'Percentage']:
+            continue
         
-        for aud in auditor_candidates_2022:
-            if aud in candidate_name:  # Exact match
-                return 'State Auditor', ''
+        county_codes.append(county_index.setdefault(county_name, len(county_index)))
+        if keep_precincts:
+            precincts.append(row[1].strip())
         
-        for sec in sos_candidates_2022:
-            if sec in candidate_name:  # Exact match
-                return 'Secretary of State', ''
+        cells = [row[col_idx] for col_idx in col_indexes]
+        try:
+            # Fast path: every cell is an integer, possibly with thousands separators
+            values.extend([int(cell.replace(',', '')) for cell in cells])
+        except ValueError:
+            for col_idx, cell in zip(col_indexes, cells):
+                votes, ok = parse_vote_cell(cell)
+                if not ok:
+                    malformed.append((row_number, county_name, col_idx, cell))
+                values.append(votes)
         
-        for tres in treasurer_candidates_2022:
-            if tres in candidate_name:  # Exact match
-                return 'State Treasurer', ''
+        if len(county_codes) >= block_rows:
+            flush()
+    flush()
     
-    # Check presidential race for 2024
-    if year == '2024':
-        for pres in president_candidates_2024:
-            if 'Trump' in candidate_name or 'Harris' in candidate_name or 'Kennedy' in candidate_name or 'Stein' in candidate_name or 'Oliver' in candidate_name or 'West' in candidate_name:
-                return 'President', ''
+    canvass = {
+        'counties': list(county_index),
+        'totals': totals,
+        'precinct_counts': precinct_counts,
+        'malformed': malformed
+    }
+    if keep_precincts:
+        canvass['county_codes'] = np.concatenate(kept_codes) if kept_codes else np.zeros(0, dtype=np.int64)
+        canvass['precincts'] = precincts
+        canvass['matrix'] = np.vstack(kept_blocks) if kept_blocks else np.zeros((0, n_cols), dtype=np.int64)
+    return canvass
+
+
+def canvass_precinct_frame(canvass, column_info):
+    """
+    Long-format precinct rows from a parsed canvass
     
-    # Check Supreme Court by year
-    year_sc = supreme_court_candidates.get(year, [])
-    for sc in year_sc:
-        if sc in candidate_name:  # Exact match
-            return 'State Supreme Court', ''
+    column_info holds (office, district, party, candidate) per candidate column.
+    Cells with zero votes are dropped.
+    """
+    n_rows, n_cols = canvass['matrix'].shape
+    votes = canvass['matrix'].ravel()
+    keep = np.flatnonzero(votes)
+    row_idx, col_idx = np.divmod(keep, n_cols) if n_cols else (keep, keep)
     
-    return 'Unknown', ''
+    columns = list(zip(*column_info)) if column_info else [(), (), (), ()]
+    return pd.DataFrame({
+        'county': np.asarray(canvass['counties'], dtype=object)[canvass['county_codes'][row_idx]],
+        'precinct': np.asarray(canvass['precincts'], dtype=object)[row_idx],
+        'office': np.asarray(columns[0], dtype=object)[col_idx],
+        'district': np.asarray(columns[1], dtype=object)[col_idx],
+        'party': np.asarray(columns[2], dtype=object)[col_idx],
+        'candidate': np.asarray(columns[3], dtype=object)[col_idx],
+        'votes': votes[keep]
+    })
 
 
-def convert_ohio_sos_to_openelections(input_file, year):
+def report_malformed_cells(malformed, headers, limit=5):
+    """Print a count of vote cells that could not be parsed, with a few examples"""
+    if not malformed:
+        return
+    
+    print(f"    ⚠ {len(malformed)} malformed vote cell(s) counted as 0")
+    for row_number, county_name, col_idx, cell in malformed[:limit]:
+        print(f"      data row {row_number}, {county_name}, '{headers[col_idx]}': {cell!r}")
+
+
+def parse_office_row(office_line):
+    """Map column indexes to offices from the office row above the header"""
+    column_to_office = {}
+    if office_line is None:
+        return column_to_office
+    
+    office_cells = next(csv.reader(StringIO(office_line)))
+    
+    current_office = None
+    for col_idx, cell in enumerate(office_cells):
+        cell_text = cell.strip()
+        
+        # Check for office names
+        if 'Governor and Lieutenant Governor' in cell_text:
+            current_office = 'Governor'
+        elif 'Attorney General' in cell_text:
+            current_office = 'Attorney General'
+        elif 'Auditor of State' in cell_text:
+            current_office = 'State Auditor'
+        elif 'Secretary of State' in cell_text:
+            current_office = 'Secretary of State'
+        elif 'Treasurer of State' in cell_text:
+            current_office = 'State Treasurer'
+        elif 'Justice of the Supreme Court' in cell_text:
+            current_office = 'State Supreme Court'
+        elif 'President and Vice President' in cell_text:
+            current_office = 'President'
+        elif 'U.S. Senator' in cell_text or '"U.S. Senator' in cell_text:
+            current_office = 'U.S. Senate'
+        elif 'Representative to Congress' in cell_text:
+            # Extract district number
+            match = re.search(r'District (\d+)', cell_text)
+            if match:
+                current_office = f'U.S. House|{match.group(1)}'
+        
+        # Map column to current office
+        if current_office:
+            column_to_office[col_idx] = current_office
+    
+    return column_to_office
+
+
+def convert_ohio_sos_to_openelections(input_file, year, keep_precincts=False):
     """
     Convert Ohio SOS CSV format to OpenElections format
     
-    Returns list of dicts with: county, office, district, party, candidate, votes
+    Precinct rows are streamed from the file and summed into per-county totals one
+    block at a time, so memory stays flat regardless of file size (unless
+    keep_precincts needs every precinct row).
+    
+    Returns list of dicts with: county, office, district, party, candidate, votes.
+    With keep_precincts=True, returns (rows, precinct DataFrame) instead.
     """
     
     print(f"\n  Processing: {input_file.name}")
     
     try:
-        # Read the file
-        with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        lines = content.split('\n')
+        office_line, headers = read_canvass_header(input_file)
         
-        # Find header row
-        header_row_idx = None
-        for idx, line in enumerate(lines):
-            if 'County Name' in line and 'Precinct Name' in line:
-                header_row_idx = idx
-                break
-        
-        if header_row_idx is None:
+        if headers is None:
             print(f"    ⚠ Could not find header row")
-            return []
+            return ([], None) if keep_precincts else []
         
         # Parse the office row (line before header) to get column-to-office mapping
-        column_to_office = {}
-        if header_row_idx > 0:
-            office_line = lines[header_row_idx - 1]
-            office_reader = csv.reader(StringIO(office_line))
-            office_cells = next(office_reader)
-            
-            current_office = None
-            for col_idx, cell in enumerate(office_cells):
-                cell_text = cell.strip()
-                
-                # Check for office names
-                if 'Governor and Lieutenant Governor' in cell_text:
-                    current_office = 'Governor'
-                elif 'Attorney General' in cell_text:
-                    current_office = 'Attorney General'
-                elif 'Auditor of State' in cell_text:
-                    current_office = 'State Auditor'
-                elif 'Secretary of State' in cell_text:
-                    current_office = 'Secretary of State'
-                elif 'Treasurer of State' in cell_text:
-                    current_office = 'State Treasurer'
-                elif 'Justice of the Supreme Court' in cell_text:
-                    current_office = 'State Supreme Court'
-                elif 'President and Vice President' in cell_text:
-                    current_office = 'President'
-                elif 'U.S. Senator' in cell_text or '"U.S. Senator' in cell_text:
-                    current_office = 'U.S. Senate'
-                elif 'Representative to Congress' in cell_text:
-                    # Extract district number
-                    match = re.search(r'District (\d+)', cell_text)
-                    if match:
-                        current_office = f'U.S. House|{match.group(1)}'
-                
-                # Map column to current office
-                if current_office:
-                    column_to_office[col_idx] = current_office
+        column_to_office = parse_office_row(office_line)
         
-        # Parse header
-        header_line = lines[header_row_idx]
-        header_reader = csv.reader(StringIO(header_line))
-        headers = next(header_reader)
+        # Candidate columns (skip metadata columns)
+        candidate_columns = [
+            (col_idx, col_name) for col_idx, col_name in enumerate(headers)
+            if col_idx >= 2 and col_name and col_name.strip() not in SOS_METADATA_COLUMNS
+        ]
         
-        # Read data rows and aggregate by county
-        data_lines = lines[header_row_idx + 1:]
-        csv_reader = csv.reader(StringIO('\n'.join(data_lines)))
+        # Parse precinct rows into integer blocks and sum each block by county
+        with stage('parse_rows', file=input_file) as step:
+            canvass = read_canvass_matrix(input_file, headers, candidate_columns, keep_precincts)
+            county_totals = canvass['totals']
+            step['rows'] = int(canvass['precinct_counts'].sum())
+            step['malformed_cells'] = len(canvass['malformed'])
         
-        county_data = {}
-        for row in csv_reader:
-            if len(row) < len(headers):
-                continue
-            
-            county_name = row[0].strip() if len(row) > 0 else ''
-            
-            # Skip summary rows
-            if not county_name or county_name in ['Total', 'Percentage']:
-                continue
+        report_malformed_cells(canvass['malformed'], headers)
+        county_precincts = dict(zip(canvass['counties'], canvass['precinct_counts'].tolist()))
+        
+        with stage('aggregate_counties', file=input_file) as step:
+            # Convert to OpenElections format
+            openelections_rows = []
             
-            if county_name not in county_data:
-                county_data[county_name] = []
+            # Debug: Check Adams county
+            if 'Adams' in county_precincts:
+                print(f"    DEBUG: Adams county has {county_precincts['Adams']} precinct rows")
             
-            county_data[county_name].append(row)
-        
-        # Convert to OpenElections format
-        openelections_rows = []
-        
-        # Debug: Check Adams county
-        if 'Adams' in county_data:
-            print(f"    DEBUG: Adams county has {len(county_data['Adams'])} precinct rows")
-        
-        for county_name, rows in county_data.items():
-            # Process each candidate column
-            for col_idx, col_name in enumerate(headers):
-                # Skip metadata columns
-                if col_idx < 2 or not col_name or col_name.strip() in [
-                    'Precinct Code', 'Region Name', 'Media Market',
-                    'Registered Voters', 'Ballots Counted', 'Official Voter Turnout',
-                    '']:
-                    continue
-                
-                # Sum votes across precincts for this county
-                total_votes = 0
-                for row in rows:
-                    if col_idx < len(row):
-                        val = row[col_idx]
-                        try:
-                            num_val = int(str(val).replace(',', '').replace('"', '').strip())
-                            total_votes += num_val
-                        except:
-                            pass
-                
-                if total_votes == 0:
-                    continue
-                
+            # Resolve candidate, party and office once per column rather than per county
+            column_info = []
+            for col_idx, col_name in candidate_columns:
                 # Parse candidate and party
                 candidate_name, party = parse_candidate_column(col_name)
                 
@@ -266,24 +353,55 @@ def convert_ohio_sos_to_openelections(input_file, year):
                     else:
                         office = office_info
                 
-                openelections_rows.append({
-                    'county': county_name,
-                    'office': office,
-                    'district': district,
-                    'party': party,
-                    'candidate': candidate_name,
-                    'votes': total_votes
-                })
+                column_info.append((office, district, party, candidate_name))
+            
+            for county_name, totals in zip(canvass['counties'], county_totals.tolist()):
+                for (office, district, party, candidate_name), total_votes in zip(column_info, totals):
+                    if total_votes == 0:
+                        continue
+                    
+                    openelections_rows.append({
+                        'county': county_name,
+                        'office': office,
+                        'district': district,
+                        'party': party,
+                        'candidate': candidate_name,
+                        'votes': total_votes
+                    })
+            
+            step['rows'] = len(openelections_rows)
         
-        print(f"    ✓ Extracted {len(openelections_rows)} rows ({len(county_data)} counties)")
+        print(f"    ✓ Extracted {len(openelections_rows)} rows ({len(canvass['counties'])} counties)")
+        if keep_precincts:
+            return openelections_rows, canvass_precinct_frame(canvass, column_info)
         return openelections_rows
     
     except Exception as e:
         print(f"    ⚠ Error: {str(e)[:100]}")
-        return []
+        return ([], None) if keep_precincts else []
 
 
-def main():
+def convert_files(file_jobs, workers=1, keep_precincts=False):
+    """
+    Convert (input_file, year) pairs, spreading them across a process pool when workers > 1
+    
+    Falls back to serial conversion if the pool cannot be started or breaks.
+    Returns one result per pair (see convert_ohio_sos_to_openelections), in the
+    order the pairs were given.
+    """
+    if workers > 1 and len(file_jobs) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(file_jobs))) as executor:
+                futures = [executor.submit(convert_ohio_sos_to_openelections, input_file, year, keep_precincts)
+                           for input_file, year in file_jobs]
+                return [future.result() for future in futures]
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"  ⚠ Process pool unavailable ({e}), falling back to serial conversion")
+    
+    return [convert_ohio_sos_to_openelections(input_file, year, keep_precincts) for input_file, year in file_jobs]
+
+
+def main(workers=1, precincts=False):
     """Convert all Ohio SOS aligned files to OpenElections format"""
     
     base_dir = Path(__file__).parent.parent / "data"
@@ -298,38 +416,50 @@ def main():
         ('2024 U.S. Congress.csv', '2024'),
     ]
     
-    all_results = {}
-    
+    file_jobs = []
     for filename, year in files_to_process:
         input_file = base_dir / filename
         if not input_file.exists():
             print(f"Skipping {filename} - file not found")
             continue
-        
-        rows = convert_ohio_sos_to_openelections(input_file, year)
-        
+        file_jobs.append((input_file, year))
+    
+    # Merge rows per year in files_to_process order so output does not depend on worker timing
+    all_results = {}
+    precinct_frames = {}
+    for (input_file, year), result in zip(file_jobs, convert_files(file_jobs, workers, precincts)):
+        rows, precinct_df = result if precincts else (result, None)
         if year not in all_results:
             all_results[year] = []
         all_results[year].extend(rows)
+        if precinct_df is not None:
+            precinct_frames.setdefault(year, []).append(precinct_df)
     
     # Save consolidated files by year
     for year, rows in all_results.items():
         if not rows:
             continue
         
-        df = pd.DataFrame(rows)
-        df = df.sort_values(['office', 'county', 'votes'], ascending=[True, True, False])
-        
         output_file = base_dir / f"{year}__oh__general__consolidated.csv"
-        df.to_csv(output_file, index=False)
+        with stage('write_consolidated', file=output_file, rows=len(rows)):
+            df = write_consolidated(pd.DataFrame(rows), output_file, year)
         
         print(f"\n✓ Saved {year} data to: {output_file.name}")
         print(f"  Total rows: {len(df):,}")
         print(f"  Counties: {df['county'].nunique()}")
         print(f"  Offices: {sorted(df['office'].unique())}")
     
+    # Optional precinct-level store per year
+    for year, frames in precinct_frames.items():
+        write_precinct_store(pd.concat(frames, ignore_index=True), base_dir / "precincts" / f"{year}.npz")
+    
     print("\nConversion complete!")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Convert Ohio SOS canvass CSVs to OpenElections format")
+    parser.add_argument('--workers', type=int, default=1, help="Number of worker processes for file conversion (default: 1, serial)")
+    parser.add_argument('--precincts', action='store_true', help="Also write precinct-level stores to data/precincts/{year}.npz")
+    args = parser.parse_args()
+    
+    main(workers=args.workers, precincts=args.precincts)
@@ -0,0 +1,312 @@
+"""
+Multi-resolution county boundaries built from shared arcs
+
+County rings are split into arcs at junctions (points where the set of
+neighbouring counties changes), so a border between two counties is a single
+arc. Each arc is simplified once with Douglas-Peucker and both counties use
+the same result, which keeps simplification topology-preserving: neighbouring
+polygons never gain gaps or overlaps. Coordinates are then quantized to a
+fixed number of decimals.
+
+Writes data/counties/ohio_counties.<level>.geojson per level plus
+data/counties/manifest.json describing the levels.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+SOURCE_GEOJSON = DATA_DIR / "ohio_counties.geojson"
+LEVELS_DIR = DATA_DIR / "counties"
+
+# Tolerances are in degrees (0.001 deg is roughly 100m in Ohio). max_zoom is the
+# highest map zoom a level is meant for; the last level covers everything above.
+LEVELS = [
+    {'name': 'low', 'tolerance': 0.01, 'decimals': 3, 'max_zoom': 7},
+    {'name': 'medium', 'tolerance': 0.002, 'decimals': 4, 'max_zoom': 9},
+    {'name': 'high', 'tolerance': 0.0004, 'decimals': 5, 'max_zoom': None},
+]
+
+
+def feature_polygons(geometry):
+    """Polygon or MultiPolygon coordinates as a list of polygons (lists of rings)"""
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def ring_points(ring):
+    """Ring coordinates as tuples without the closing point"""
+    points = [tuple(point[:2]) for point in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    return points
+
+
+def find_junctions(rings):
+    """Points that are shared by rings with different neighbouring points"""
+    neighbours = {}
+    junctions = set()
+    for points in rings:
+        n = len(points)
+        for i, point in enumerate(points):
+            pair = frozenset((points[i - 1], points[(i + 1) % n]))
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def build_topology(features):
+    """
+    Split every ring into shared arcs
+
+    Returns (arcs, shapes): arcs is a list of point lists, shapes has one entry
+    per feature holding polygons -> rings -> arc references. A reference i uses
+    arcs[i] as stored and ~i uses it reversed, as in TopoJSON.
+    """
+    feature_rings = [[[ring_points(ring) for ring in polygon] for polygon in feature_polygons(f['geometry'])]
+                     for f in features]
+    all_rings = [ring for polygons in feature_rings for polygon in polygons for ring in polygon]
+    junctions = find_junctions(all_rings)
+
+    arcs = []
+    arc_index = {}
+
+    def add_arc(points):
+        key = tuple(points)
+        if key in arc_index:
+            return arc_index[key]
+        reverse_key = key[::-1]
+        if reverse_key in arc_index:
+            return ~arc_index[reverse_key]
+        arc_index[key] = len(arcs)
+        arcs.append(list(points))
+        return arc_index[key]
+
+    shapes = []
+    for polygons in feature_rings:
+        shape = []
+        for polygon in polygons:
+            rings = []
+            for points in polygon:
+                cuts = [i for i, point in enumerate(points) if point in junctions]
+                if not cuts:
+                    # Ring with no junction (e.g. an island): one closed arc, starting at its smallest point
+                    start = points.index(min(points))
+                    rotated = points[start:] + points[:start]
+                    closed = rotated + [rotated[0]]
+                    if tuple(closed[::-1]) in arc_index:
+                        rings.append([~arc_index[tuple(closed[::-1])]])
+                    else:
+                        rings.append([add_arc(closed)])
+                    continue
+
+                # Rotate so the ring starts at a junction, then cut at every junction
+                rotated = points[cuts[0]:] + points[:cuts[0]] + [points[cuts[0]]]
+                ring_arcs = []
+                start = 0
+                for i in range(1, len(rotated)):
+                    if rotated[i] in junctions or i == len(rotated) - 1:
+                        ring_arcs.append(add_arc(rotated[start:i + 1]))
+                        start = i
+                rings.append(ring_arcs)
+            shape.append(rings)
+        shapes.append(shape)
+
+    return arcs, shapes
+
+
+def douglas_peucker(points, tolerance):
+    """Indexes of the points kept by Douglas-Peucker; endpoints are always kept"""
+    n = len(points)
+    if n <= 2:
+        return list(range(n))
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[start + 1:end]
+        a = points[start]
+        b = points[end]
+        ab = b - a
+        length = np.hypot(ab[0], ab[1])
+        if length == 0:
+            distances = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            distances = np.abs(ab[0] * (segment[:, 1] - a[1]) - ab[1] * (segment[:, 0] - a[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return np.flatnonzero(keep).tolist()
+
+
+def simplify_arc(points, tolerance, min_interior=0):
+    """
+    Simplify one arc, keeping its endpoints
+
+    min_interior forces the arc to keep at least that many interior points
+    (the farthest ones from the chord), used for rings that would collapse.
+    """
+    coords = np.asarray(points, dtype=float)
+    if tolerance <= 0:
+        return [tuple(p) for p in coords]
+    if coords[0].tolist() == coords[-1].tolist() and len(coords) > 3:
+        # Closed arc: split at the point farthest from the start so both halves have a chord
+        farthest = int(np.argmax(np.hypot(*(coords - coords[0]).T)))
+        first = douglas_peucker(coords[:farthest + 1], tolerance)
+        second = [farthest + i for i in douglas_peucker(coords[farthest:], tolerance)]
+        kept = sorted(set(first) | set(second))
+    else:
+        kept = douglas_peucker(coords, tolerance)
+
+    interior = len(kept) - 2
+    if interior < min_interior and len(coords) - 2 > interior:
+        # Add the points farthest from the chord until the minimum is met
+        a, b = coords[0], coords[-1]
+        ab = b - a
+        length = np.hypot(*ab) or 1.0
+        distances = np.abs(ab[0] * (coords[:, 1] - a[1]) - ab[1] * (coords[:, 0] - a[0])) / length
+        distances[kept] = -1
+        extra = np.argsort(-distances)[:min_interior - interior]
+        kept = sorted(set(kept) | set(extra.tolist()))
+    return [tuple(coords[i]) for i in kept]
+
+
+def quantize_arc(points, decimals):
+    """Round coordinates (unless decimals is None) and drop consecutive duplicates"""
+    result = []
+    for x, y in points:
+        point = (x, y) if decimals is None else (round(x, decimals), round(y, decimals))
+        if not result or result[-1] != point:
+            result.append(point)
+    return result
+
+
+def arc_points(arcs, ref):
+    return arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+
+
+def assemble_ring(arcs, refs):
+    """Join a ring's arcs into a closed coordinate list"""
+    ring = []
+    for ref in refs:
+        points = arc_points(arcs, ref)
+        ring.extend(points if not ring else points[1:])
+    if ring and ring[0] != ring[-1]:
+        ring.append(ring[0])
+    return [list(point) for point in ring]
+
+
+def simplify_topology(arcs, shapes, tolerance, decimals):
+    """
+    Simplified, quantized arcs for one level
+
+    Rings that would end up with fewer than four coordinates get their arcs
+    re-simplified with extra interior points, so no county collapses.
+    """
+    min_interior = [0] * len(arcs)
+    while True:
+        simplified = [quantize_arc(simplify_arc(arc, tolerance, min_interior[i]), decimals)
+                      for i, arc in enumerate(arcs)]
+        degenerate = False
+        for shape in shapes:
+            for polygon in shape:
+                for refs in polygon:
+                    if len(set(map(tuple, assemble_ring(simplified, refs)))) >= 3:
+                        continue
+                    for ref in refs:
+                        index = ref if ref >= 0 else ~ref
+                        if min_interior[index] < len(arcs[index]) - 2:
+                            min_interior[index] += 1
+                            degenerate = True
+        if not degenerate:
+            return simplified
+
+
+def shape_geometry(arcs, shape):
+    """GeoJSON geometry for a feature's polygons of arc references"""
+    polygons = [[assemble_ring(arcs, refs) for refs in polygon] for polygon in shape]
+    if len(polygons) == 1:
+        return {'type': 'Polygon', 'coordinates': polygons[0]}
+    return {'type': 'MultiPolygon', 'coordinates': polygons}
+
+
+def write_levels(source=SOURCE_GEOJSON, output_dir=LEVELS_DIR, levels=LEVELS, decimals=None):
+    """Write one simplified GeoJSON per level and a manifest; returns the manifest"""
+    with open(source, 'r', encoding='utf-8') as f:
+        collection = json.load(f)
+    features = collection['features']
+
+    arcs, shapes = build_topology(features)
+    source_vertices = sum(len(arc) for arc in arcs)
+    print(f"Built {len(arcs)} shared arcs from {len(features)} counties ({source_vertices:,} arc vertices)")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {'source': Path(source).name, 'levels': []}
+
+    min_zoom = 0
+    for level in levels:
+        level_decimals = level['decimals'] if decimals is None else decimals
+        simplified = simplify_topology(arcs, shapes, level['tolerance'], level_decimals)
+
+        level_features = [{
+            'type': 'Feature',
+            'properties': feature['properties'],
+            'geometry': shape_geometry(simplified, shape)
+        } for feature, shape in zip(features, shapes)]
+        output = {'type': 'FeatureCollection', 'features': level_features}
+        if 'crs' in collection:
+            output['crs'] = collection['crs']
+
+        file_name = f"ohio_counties.{level['name']}.geojson"
+        with open(output_dir / file_name, 'w', encoding='utf-8') as f:
+            json.dump(output, f, separators=(',', ':'))
+
+        vertices = sum(len(arc) for arc in simplified)
+        size = (output_dir / file_name).stat().st_size
+        manifest['levels'].append({
+            'name': level['name'],
+            'file': file_name,
+            'tolerance': level['tolerance'],
+            'decimals': level_decimals,
+            'min_zoom': min_zoom,
+            'max_zoom': level['max_zoom'],
+            'vertices': vertices,
+            'bytes': size
+        })
+        if level['max_zoom'] is not None:
+            min_zoom = level['max_zoom'] + 1
+        print(f"  ✓ {level['name']}: tolerance {level['tolerance']}, {level_decimals} decimals, "
+              f"{vertices:,} vertices, {size / 1024:.0f} KB")
+
+    with open(output_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Level manifest saved to: {output_dir / 'manifest.json'}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write simplified county boundary levels from ohio_counties.geojson")
+    parser.add_argument('--source', type=Path, default=SOURCE_GEOJSON)
+    parser.add_argument('--output-dir', type=Path, default=LEVELS_DIR)
+    parser.add_argument('--decimals', type=int, help="Coordinate decimals for every level (default: per level)")
+    args = parser.parse_args()
+
+    write_levels(args.source, args.output_dir, decimals=args.decimals)
+
+
+if __name__ == "__main__":
+    main()
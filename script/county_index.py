@@ -0,0 +1,218 @@
+"""
+County adjacency graph and bounding-box spatial index
+
+data/county_index.json caches, for every county in feature order, its
+bounding box and neighbours, plus a uniform grid mapping each cell to the
+counties whose bounding box overlaps it. Counties are neighbours when they
+share a border arc (county_geometry.build_topology), so counties touching
+only at a corner are not neighbours.
+
+CountyIndex answers neighbour lookups from the cached graph and
+point-in-county queries by checking the grid cell's candidates, first by
+bounding box and then by ray casting against the county rings.
+
+    python script/county_index.py --neighbors Mahoning
+    python script/county_index.py --point -80.65 41.10
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from county_geometry import SOURCE_GEOJSON, build_topology, feature_polygons
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+INDEX_FILE = DATA_DIR / "county_index.json"
+
+INDEX_FORMAT = "ohio-county-index-v1"
+
+# Grid cell size in degrees; Ohio counties are roughly 0.3-0.5 deg across
+GRID_CELL = 0.1
+
+
+def county_name(feature):
+    props = feature.get('properties') or {}
+    return props.get('NAME20') or props.get('NAMELSAD20') or ''
+
+
+def build_adjacency(features):
+    """Sorted neighbour indexes for every feature, from arcs shared by two features"""
+    arcs, shapes = build_topology(features)
+    owners = [set() for _ in arcs]
+    for i, shape in enumerate(shapes):
+        for polygon in shape:
+            for refs in polygon:
+                for ref in refs:
+                    owners[ref if ref >= 0 else ~ref].add(i)
+
+    neighbours = [set() for _ in features]
+    for arc_owners in owners:
+        for i in arc_owners:
+            neighbours[i].update(arc_owners - {i})
+    return [sorted(n) for n in neighbours]
+
+
+def feature_bbox(feature):
+    """[min_x, min_y, max_x, max_y] of a feature's outer rings"""
+    points = np.concatenate([np.asarray(polygon[0], dtype=float)[:, :2]
+                             for polygon in feature_polygons(feature['geometry'])])
+    return [*points.min(axis=0).tolist(), *points.max(axis=0).tolist()]
+
+
+def build_grid(bboxes, cell=GRID_CELL):
+    """Origin, shape and {"col,row": [feature indexes]} for bounding boxes on a uniform grid"""
+    boxes = np.asarray(bboxes)
+    x0, y0 = float(boxes[:, 0].min()), float(boxes[:, 1].min())
+    cols = int(np.floor((boxes[:, 2].max() - x0) / cell)) + 1
+    rows = int(np.floor((boxes[:, 3].max() - y0) / cell)) + 1
+
+    cells = {}
+    for i, (min_x, min_y, max_x, max_y) in enumerate(bboxes):
+        for col in range(int((min_x - x0) // cell), int((max_x - x0) // cell) + 1):
+            for row in range(int((min_y - y0) // cell), int((max_y - y0) // cell) + 1):
+                cells.setdefault(f"{col},{row}", []).append(i)
+    return {'origin': [x0, y0], 'cell': cell, 'shape': [cols, rows], 'cells': cells}
+
+
+def write_county_index(source=SOURCE_GEOJSON, output=INDEX_FILE):
+    """Build the adjacency list and spatial index for a county GeoJSON file; returns the index"""
+    with open(source, 'r', encoding='utf-8') as f:
+        features = json.load(f)['features']
+
+    names = [county_name(feature) for feature in features]
+    adjacency = build_adjacency(features)
+    bboxes = [feature_bbox(feature) for feature in features]
+    index = {
+        'format': INDEX_FORMAT,
+        'source': Path(source).name,
+        'counties': names,
+        'geoids': [(feature.get('properties') or {}).get('GEOID20') for feature in features],
+        'bboxes': bboxes,
+        'neighbors': {name: sorted(names[j] for j in adjacency[i]) for i, name in enumerate(names)},
+        'grid': build_grid(bboxes)
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    edges = sum(len(n) for n in adjacency) // 2
+    isolated = [names[i] for i, n in enumerate(adjacency) if not n]
+    print(f"✓ County index saved to: {output}")
+    print(f"  {len(names)} counties, {edges} adjacent pairs, {len(index['grid']['cells'])} grid cells")
+    if isolated:
+        print(f"⚠ Counties with no neighbours: {isolated}")
+    return index
+
+
+def ring_edges(ring):
+    """Edge start/end coordinate arrays of a ring, precomputed for point_in_rings"""
+    coords = np.asarray(ring, dtype=float)[:, :2]
+    xs, ys = coords[:, 0], coords[:, 1]
+    return xs, ys, np.roll(xs, 1), np.roll(ys, 1)
+
+
+def point_in_rings(x, y, rings):
+    """Even-odd ray casting against a polygon's ring edges (holes included)"""
+    inside = False
+    for xs, ys, xj, yj in rings:
+        crosses = (ys > y) != (yj > y)
+        if not crosses.any():
+            continue
+        xs, ys, xj, yj = xs[crosses], ys[crosses], xj[crosses], yj[crosses]
+        x_cross = (xj - xs) * (y - ys) / (yj - ys) + xs
+        inside ^= bool(np.count_nonzero(x < x_cross) % 2)
+    return inside
+
+
+class CountyIndex:
+    """Cached adjacency graph and spatial index, with neighbour and point lookups"""
+
+    def __init__(self, index, geometry_file=None):
+        if index.get('format') != INDEX_FORMAT:
+            raise ValueError(f"Unsupported county index format: {index.get('format')}")
+        self.counties = index['counties']
+        self.geoids = index['geoids']
+        self.bboxes = np.asarray(index['bboxes'])
+        self._positions = {name: i for i, name in enumerate(self.counties)}
+        self._neighbors = {name: frozenset(n) for name, n in index['neighbors'].items()}
+        self._neighbor_lists = index['neighbors']
+
+        grid = index['grid']
+        self._origin = grid['origin']
+        self._cell = grid['cell']
+        self._cells = {tuple(map(int, key.split(','))): value for key, value in grid['cells'].items()}
+
+        self.geometry_file = Path(geometry_file) if geometry_file else DATA_DIR / index['source']
+        self._rings = None
+
+    @classmethod
+    def load(cls, path=INDEX_FILE, geometry_file=None):
+        """Load the cached index (geometry is read on the first point query)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), geometry_file)
+
+    def neighbors(self, county):
+        """Names of the counties sharing a border with county"""
+        return self._neighbor_lists.get(county, [])
+
+    def are_adjacent(self, county, other):
+        return other in self._neighbors.get(county, ())
+
+    def bbox(self, county):
+        """[min_x, min_y, max_x, max_y] of a county"""
+        return self.bboxes[self._positions[county]].tolist()
+
+    def candidates(self, lon, lat):
+        """Counties whose bounding box contains the point"""
+        col = int((lon - self._origin[0]) // self._cell)
+        row = int((lat - self._origin[1]) // self._cell)
+        result = []
+        for i in self._cells.get((col, row), ()):
+            min_x, min_y, max_x, max_y = self.bboxes[i]
+            if min_x <= lon <= max_x and min_y <= lat <= max_y:
+                result.append(self.counties[i])
+        return result
+
+    def county_at(self, lon, lat):
+        """Name of the county containing the point, or None"""
+        candidates = self.candidates(lon, lat)
+        if not candidates:
+            return None
+        if self._rings is None:
+            self._load_rings()
+        for county in candidates:
+            for rings in self._rings[self._positions[county]]:
+                if point_in_rings(lon, lat, rings):
+                    return county
+        return None
+
+    def _load_rings(self):
+        with open(self.geometry_file, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+        if [county_name(feature) for feature in features] != self.counties:
+            raise ValueError(f"{self.geometry_file} does not match the county index; rebuild it")
+        self._rings = [[[ring_edges(ring) for ring in polygon]
+                        for polygon in feature_polygons(feature['geometry'])] for feature in features]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the county adjacency graph and spatial index")
+    parser.add_argument('--build', action='store_true', help="Rebuild data/county_index.json from the county GeoJSON")
+    parser.add_argument('--source', type=Path, default=SOURCE_GEOJSON)
+    parser.add_argument('--index', type=Path, default=INDEX_FILE)
+    parser.add_argument('--neighbors', metavar='COUNTY', help="List a county's neighbours")
+    parser.add_argument('--point', nargs=2, type=float, metavar=('LON', 'LAT'), help="County containing a point")
+    args = parser.parse_args()
+
+    if args.build or not args.index.exists():
+        write_county_index(args.source, args.index)
+
+    index = CountyIndex.load(args.index, args.source)
+    if args.neighbors:
+        print(f"{args.neighbors}: {', '.join(index.neighbors(args.neighbors)) or 'no neighbours found'}")
+    if args.point:
+        print(f"({args.point[0]}, {args.point[1]}): {index.county_at(*args.point) or 'outside every county'}")
+
+
+if __name__ == "__main__":
+    main()
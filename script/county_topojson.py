@@ -0,0 +1,173 @@
+"""
+TopoJSON encoding of the county boundaries
+
+Shared borders are stored once as arcs (see county_geometry.build_topology),
+coordinates are quantized to integers on a grid over the state's bounding box
+and delta-encoded along each arc, and each county keeps only the properties
+the map reads, with its FIPS code as the feature id. The output is standard
+TopoJSON, so topojson-client can read it in the browser; decode_topology()
+turns it back into GeoJSON for checks.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from county_geometry import SOURCE_GEOJSON, build_topology, shape_geometry, simplify_topology
+
+TOPOJSON_FILE = SOURCE_GEOJSON.with_suffix('.topojson')
+
+# Properties the map uses, and the property used as the feature id
+MAP_PROPERTIES = ['NAME20']
+ID_PROPERTY = 'GEOID20'
+
+# Grid cells per axis; 1e5 over Ohio is roughly 5m x 4m
+DEFAULT_QUANTIZATION = 100000
+
+
+def encode_arcs(arcs, quantization):
+    """Quantize and delta-encode arcs; returns (transform, encoded arcs)"""
+    points = np.concatenate([np.asarray(arc, dtype=float) for arc in arcs])
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    kx = (x1 - x0) / (quantization - 1) or 1.0
+    ky = (y1 - y0) / (quantization - 1) or 1.0
+
+    encoded = []
+    for arc in arcs:
+        grid = np.rint((np.asarray(arc, dtype=float) - [x0, y0]) / [kx, ky]).astype(np.int64)
+        deltas = np.diff(grid, axis=0)
+        # Points that land in the same cell as the previous one add nothing
+        deltas = deltas[np.any(deltas != 0, axis=1)]
+        if len(deltas) == 0:
+            deltas = np.zeros((1, 2), dtype=np.int64)
+        encoded.append([grid[0].tolist()] + deltas.tolist())
+
+    transform = {'scale': [kx, ky], 'translate': [float(x0), float(y0)]}
+    return transform, encoded
+
+
+def encode_topology(collection, quantization=DEFAULT_QUANTIZATION, tolerance=0,
+                    properties=MAP_PROPERTIES, id_property=ID_PROPERTY):
+    """TopoJSON document for a county FeatureCollection"""
+    features = collection['features']
+    arcs, shapes = build_topology(features)
+    if tolerance > 0:
+        arcs = simplify_topology(arcs, shapes, tolerance, None)
+    transform, encoded = encode_arcs(arcs, quantization)
+
+    geometries = []
+    for feature, shape in zip(features, shapes):
+        props = feature.get('properties') or {}
+        geometry = {
+            'type': 'Polygon' if len(shape) == 1 else 'MultiPolygon',
+            'arcs': shape[0] if len(shape) == 1 else shape,
+            'properties': {name: props.get(name) for name in properties}
+        }
+        if id_property and props.get(id_property) is not None:
+            geometry['id'] = props[id_property]
+        geometries.append(geometry)
+
+    return {
+        'type': 'Topology',
+        'transform': transform,
+        'objects': {'counties': {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': encoded
+    }
+
+
+def decode_arcs(topology):
+    """Absolute coordinates for every arc of a quantized topology"""
+    (kx, ky), (tx, ty) = topology['transform']['scale'], topology['transform']['translate']
+    decoded = []
+    for arc in topology['arcs']:
+        grid = np.cumsum(np.asarray(arc, dtype=np.int64), axis=0)
+        decoded.append([(x * kx + tx, y * ky + ty) for x, y in grid.tolist()])
+    return decoded
+
+
+def decode_topology(topology, object_name='counties'):
+    """GeoJSON FeatureCollection for one object of a TopoJSON document"""
+    arcs = decode_arcs(topology)
+    features = []
+    for geometry in topology['objects'][object_name]['geometries']:
+        shape = [geometry['arcs']] if geometry['type'] == 'Polygon' else geometry['arcs']
+        feature = {'type': 'Feature', 'properties': geometry.get('properties', {}),
+                   'geometry': shape_geometry(arcs, shape)}
+        if 'id' in geometry:
+            feature['id'] = geometry['id']
+        features.append(feature)
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def round_trip_error(collection, topology):
+    """
+    Largest distance (in degrees) from any source vertex to the decoded ring
+
+    Only meaningful without simplification: every source vertex should then be
+    within half a grid cell of its decoded position.
+    """
+    decoded = decode_topology(topology)
+    worst = 0.0
+    for source, result in zip(collection['features'], decoded['features']):
+        source_rings = [ring for polygon in _polygons(source['geometry']) for ring in polygon]
+        result_rings = [ring for polygon in _polygons(result['geometry']) for ring in polygon]
+        if len(source_rings) != len(result_rings):
+            return float('inf')
+        for ring, decoded_ring in zip(source_rings, result_rings):
+            a = np.asarray(ring, dtype=float)[:, :2]
+            b = np.asarray(decoded_ring, dtype=float)
+            # Nearest decoded vertex for every source vertex
+            nearest = np.min(np.hypot(a[:, None, 0] - b[None, :, 0], a[:, None, 1] - b[None, :, 1]), axis=1)
+            worst = max(worst, float(nearest.max()))
+    return worst
+
+
+def _polygons(geometry):
+    return [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+
+
+def write_topojson(source=SOURCE_GEOJSON, output=TOPOJSON_FILE, quantization=DEFAULT_QUANTIZATION, tolerance=0):
+    """Encode a county GeoJSON file as TopoJSON; returns the output size in bytes"""
+    with open(source, 'r', encoding='utf-8') as f:
+        collection = json.load(f)
+
+    topology = encode_topology(collection, quantization, tolerance)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(topology, f, separators=(',', ':'))
+
+    source_size = Path(source).stat().st_size
+    size = Path(output).stat().st_size
+    print(f"✓ TopoJSON saved to: {output}")
+    print(f"  {len(topology['arcs'])} arcs, {size / 1024:.0f} KB ({source_size / size:.1f}x smaller than {Path(source).name})")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode ohio_counties.geojson as TopoJSON")
+    parser.add_argument('--source', type=Path, default=SOURCE_GEOJSON)
+    parser.add_argument('--output', type=Path, default=TOPOJSON_FILE)
+    parser.add_argument('--quantization', type=int, default=DEFAULT_QUANTIZATION, help="Grid cells per axis")
+    parser.add_argument('--tolerance', type=float, default=0, help="Simplification tolerance in degrees (default: none)")
+    parser.add_argument('--check', action='store_true', help="Decode the output and report the round-trip error")
+    args = parser.parse_args()
+
+    write_topojson(args.source, args.output, args.quantization, args.tolerance)
+
+    if args.check:
+        with open(args.source, 'r', encoding='utf-8') as f:
+            collection = json.load(f)
+        with open(args.output, 'r', encoding='utf-8') as f:
+            topology = json.load(f)
+        error = round_trip_error(collection, topology)
+        cell = max(topology['transform']['scale'])
+        if args.tolerance > 0:
+            print(f"  Round-trip error: {error:.7f} deg (simplified, so not bounded by the grid)")
+        else:
+            status = '✓' if error <= cell else '⚠'
+            print(f"  {status} Round-trip error: {error:.7f} deg (grid cell {cell:.7f} deg)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,23 @@
 Convert Ohio county shapefile to GeoJSON format
 """
 import geopandas as gpd
+import argparse
 import json
 from pathlib import Path
 
-def create_geojson():
-    """Convert the Ohio county shapefile to GeoJSON"""
+from county_geometry import LEVELS_DIR, write_levels
+from county_index import INDEX_FILE, write_county_index
+from county_topojson import TOPOJSON_FILE, write_topojson
+
+def create_geojson(decimals=None, topojson=False):
+    """
+    Convert the Ohio county shapefile to GeoJSON
+    
+    Also writes simplified per-zoom levels and their manifest to data/counties/
+    (decimals overrides each level's coordinate precision). With topojson, also
+    writes a quantized TopoJSON copy to data/ohio_counties.topojson. The county
+    adjacency graph and spatial index are cached in data/county_index.json.
+    """
     
     # Define paths
     base_dir = Path(__file__).parent.parent
@@ -39,6 +51,22 @@ def create_geojson():
         print(f"\nCounty names:")
         for idx, row in gdf.iterrows():
             print(f"  - {row[name_col]}")
+    
+    # Simplified levels so the map can load a coarse layer first
+    print(f"\nWriting simplified levels to: {LEVELS_DIR}")
+    write_levels(output_path, LEVELS_DIR, decimals=decimals)
+
+    print(f"\nWriting county adjacency and spatial index to: {INDEX_FILE}")
+    write_county_index(output_path, INDEX_FILE)
+
+    if topojson:
+        print(f"\nWriting TopoJSON to: {TOPOJSON_FILE}")
+        write_topojson(output_path, TOPOJSON_FILE)
 
 if __name__ == "__main__":
-    create_geojson()
+    parser = argparse.ArgumentParser(description="Convert the Ohio county shapefile to GeoJSON")
+    parser.add_argument('--decimals', type=int, help="Coordinate decimals for every simplified level (default: per level)")
+    parser.add_argument('--topojson', action='store_true', help="Also write data/ohio_counties.topojson")
+    args = parser.parse_args()
+    
+    create_geojson(decimals=args.decimals, topojson=args.topojson)
@@ -0,0 +1,161 @@
+"""
+Indexed, load-once access to the transformed Ohio election results
+
+Builds lookup tables by (year, office), (county, office) and (county, year) so
+analysis scripts do not have to walk the nested JSON by hand.
+"""
+import json
+from pathlib import Path
+
+from columnar_results import COLUMNAR_FORMAT, expand_columnar_results
+
+DEFAULT_RESULTS_FILE = Path(__file__).parent.parent / "data" / "ohio_election_results.json"
+
+# Office names that vary between source files, mapped to one canonical name
+OFFICE_ALIASES = {
+    'President and Vice President': 'President',
+    'Governor/Lieutenant Governor': 'Governor',
+    'Governor/LtGovernor': 'Governor',
+    'US Senate': 'U.S. Senate',
+    'Auditor of State': 'State Auditor',
+    'Treasurer of State': 'State Treasurer',
+    'Treasure of State': 'State Treasurer',
+    'Justice of the Supreme Court': 'State Supreme Court',
+}
+
+
+def canonical_office(office):
+    """Map an office name variant to its canonical name"""
+    return OFFICE_ALIASES.get(office, office)
+
+
+def pick_contest_key(contest_keys, office):
+    """
+    Choose the main contest for an office among a year's contest keys
+
+    Prefers an exact match, then a key that starts with the office name
+    (e.g. "President - District 12"), then any key containing it.
+    """
+    contest_keys = list(contest_keys)
+    if office in contest_keys:
+        return office
+
+    office_lower = office.lower()
+    for key in contest_keys:
+        if key.lower().startswith(office_lower):
+            return key
+    for key in contest_keys:
+        if office_lower in key.lower():
+            return key
+
+    return contest_keys[0] if contest_keys else None
+
+
+class ElectionResults:
+    """Election results loaded once, with precomputed lookup indexes"""
+
+    def __init__(self, document):
+        self.metadata = document.get('metadata', {})
+        self.palette = document.get('competitiveness_palette', {})
+        self.years = sorted(document.get('results_by_year', {}).keys())
+        self.year_offices = {year: list(document['results_by_year'][year].keys()) for year in self.years}
+
+        self._contests = {}
+        self._primary = {}
+        self._by_county_office = {}
+        self._by_county_year = {}
+
+        for year in self.years:
+            for office, contests in document['results_by_year'][year].items():
+                office_key = canonical_office(office)
+                self._contests.setdefault((year, office_key), {}).update(contests)
+
+        for (year, office), contests in self._contests.items():
+            contest_key = pick_contest_key(contests.keys(), office)
+            results = contests[contest_key]['results'] if contest_key else {}
+            self._primary[(year, office)] = results
+
+            for county, record in results.items():
+                self._by_county_office.setdefault((county, office), {})[year] = record
+                self._by_county_year.setdefault((county, year), {})[office] = record
+
+        self.offices = sorted({office for _, office in self._contests})
+        self.counties = sorted({county for county, _ in self._by_county_year})
+        self._resolved_offices = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_RESULTS_FILE):
+        """Load nested or columnar results JSON"""
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+
+        if document.get('format') == COLUMNAR_FORMAT:
+            document = expand_columnar_results(document)
+
+        return cls(document)
+
+    def resolve_office(self, office):
+        """
+        Resolve an office query to a canonical office name
+
+        Known aliases resolve directly; otherwise falls back to a case-insensitive
+        substring match against the loaded offices.
+        """
+        if office in self._resolved_offices:
+            return self._resolved_offices[office]
+
+        resolved = canonical_office(office)
+        if resolved not in self.offices:
+            resolved_lower = resolved.lower()
+            for known in self.offices:
+                if resolved_lower in known.lower() or known.lower() in resolved_lower:
+                    resolved = known
+                    break
+
+        self._resolved_offices[office] = resolved
+        return resolved
+
+    def contests(self, year, office):
+        """All contests for a year and office, keyed by contest key"""
+        return self._contests.get((str(year), self.resolve_office(office)), {})
+
+    def resolve_contest(self, year, office):
+        """Key of the main contest for a year and office, or None"""
+        return pick_contest_key(self.contests(year, office).keys(), self.resolve_office(office))
+
+    def results(self, year, office):
+        """County results of the main contest for a year and office"""
+        return self._primary.get((str(year), self.resolve_office(office)), {})
+
+    def result(self, year, office, county):
+        """One county's result record, or None"""
+        return self.results(year, office).get(county)
+
+    def margin(self, year, office, county):
+        """Margin percentage (R minus D) for one county, or None"""
+        record = self.result(year, office, county)
+        return record['margin_pct'] if record else None
+
+    def county_history(self, county, office):
+        """A county's result records for an office, keyed by year"""
+        return self._by_county_office.get((county, self.resolve_office(office)), {})
+
+    def margin_series(self, county, office):
+        """Margin percentage by year for one county and office"""
+        return {year: record['margin_pct'] for year, record in self.county_history(county, office).items()}
+
+    def vote_series(self, county, office):
+        """DEM/REP/other/total votes by year for one county and office"""
+        return {
+            year: {
+                'dem_votes': record['dem_votes'],
+                'rep_votes': record['rep_votes'],
+                'other_votes': record['other_votes'],
+                'total_votes': record['total_votes']
+            }
+            for year, record in self.county_history(county, office).items()
+        }
+
+    def county_year(self, county, year):
+        """All of a county's main-contest results in one year, keyed by office"""
+        return self._by_county_year.get((county, str(year)), {})
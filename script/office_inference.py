@@ -0,0 +1,92 @@
+"""
+Data-driven office inference for SOS canvass candidate columns
+
+Rules live in office_inference.json. For each (year, file) the applicable rules
+are compiled once into a single regex over every candidate pattern, and results
+are memoized per candidate column, so adding an election year means editing the
+JSON file rather than Python.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+RULES_FILE = Path(__file__).parent / "office_inference.json"
+
+
+@lru_cache(maxsize=None)
+def load_office_rules(rules_file=RULES_FILE):
+    """Load the ordered office inference rules"""
+    with open(rules_file, 'r', encoding='utf-8') as f:
+        return json.load(f)['rules']
+
+
+def rule_applies(rule, filename, year):
+    """Whether a rule's filename and year restrictions allow it for this file"""
+    if 'filename' in rule and not any(hint in filename for hint in rule['filename']):
+        return False
+    if 'years' in rule and year not in rule['years']:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def compile_office_matcher(filename, year, rules_file=RULES_FILE):
+    """
+    Compile the rules that apply to one (year, file) into a matcher
+
+    Returns (pattern, group_rules, all_of, default_rule, rules):
+      pattern      - one regex with a lookahead group per candidate pattern, ordered by rule
+      group_rules  - rule index for each group in pattern
+      all_of       - (rule index, [required substrings]) pairs
+      default_rule - index of the first rule without candidate patterns, or None
+      rules        - the applicable rules in order
+    """
+    rules = [rule for rule in load_office_rules(rules_file) if rule_applies(rule, filename, year)]
+
+    alternatives = []
+    group_rules = []
+    all_of = []
+    default_rule = None
+
+    for idx, rule in enumerate(rules):
+        if 'candidates' not in rule and 'all_of' not in rule:
+            if default_rule is None:
+                default_rule = idx
+            continue
+
+        for candidate in rule.get('candidates', []):
+            alternatives.append(f"({re.escape(candidate)})")
+            group_rules.append(idx)
+        for group in rule.get('all_of', []):
+            all_of.append((idx, group))
+
+    # At each position the first alternative that matches belongs to the earliest rule,
+    # so the smallest rule index over all positions is the first matching rule
+    pattern = re.compile(f"(?=(?:{'|'.join(alternatives)}))") if alternatives else None
+
+    return pattern, group_rules, all_of, default_rule, rules
+
+
+@lru_cache(maxsize=None)
+def infer_office(candidate_name, filename, year, rules_file=RULES_FILE):
+    """Infer (office, district) for a candidate column, or ('Unknown', '')"""
+    pattern, group_rules, all_of, default_rule, rules = compile_office_matcher(filename, year, rules_file)
+
+    matched = []
+    if default_rule is not None:
+        matched.append(default_rule)
+
+    if pattern is not None:
+        for match in pattern.finditer(candidate_name):
+            matched.append(group_rules[match.lastindex - 1])
+
+    for idx, group in all_of:
+        if all(term in candidate_name for term in group):
+            matched.append(idx)
+
+    if not matched:
+        return 'Unknown', ''
+
+    rule = rules[min(matched)]
+    return rule['office'], rule.get('district', '')
@@ -0,0 +1,118 @@
+"""
+Opt-in per-stage timing and memory instrumentation for the pipeline scripts
+
+Set PIPELINE_TRACE=<path> (or call enable(path)) to record wall time, rows and
+allocated/peak memory for every stage. The trace is written as JSON when the
+script exits. When tracing is off, stage() does nothing.
+"""
+import atexit
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+_trace = None
+
+
+def enable(output_path):
+    """Start recording stages and write the trace to output_path at exit"""
+    global _trace
+    if _trace is not None:
+        return
+
+    _trace = {
+        'output_path': Path(output_path),
+        'script': Path(sys.argv[0]).name if sys.argv and sys.argv[0] else None,
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'stages': [],
+        'stack': []
+    }
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    atexit.register(write_trace)
+
+
+def is_enabled():
+    return _trace is not None
+
+
+@contextmanager
+def stage(name, file=None, rows=None):
+    """
+    Record one pipeline stage
+
+    Yields a dict whose 'rows' entry can be filled in once the count is known:
+
+        with stage('read_csv', file=path) as step:
+            df = pd.read_csv(path)
+            step['rows'] = len(df)
+    """
+    record = {'stage': name, 'file': Path(file).name if file else None, 'rows': rows}
+    if _trace is None:
+        yield record
+        return
+
+    parent = _trace['stack'][-1] if _trace['stack'] else None
+    if parent is not None:
+        # Keep the parent's peak so far before resetting for this stage
+        parent['_peak'] = max(parent['_peak'], tracemalloc.get_traced_memory()[1])
+
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    record['_peak'] = 0
+    _trace['stack'].append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        _trace['stack'].pop()
+
+        peak = max(peak, record.pop('_peak'))
+        record['seconds'] = round(elapsed, 6)
+        record['allocated_bytes'] = current - start_bytes
+        record['peak_bytes'] = max(peak - start_bytes, 0)
+        record['depth'] = len(_trace['stack'])
+        _trace['stages'].append(record)
+
+        if parent is not None:
+            parent['_peak'] = max(parent['_peak'], peak)
+
+
+def summarize(stages):
+    """Totals per stage name across files"""
+    totals = {}
+    for record in stages:
+        total = totals.setdefault(record['stage'], {'calls': 0, 'rows': 0, 'seconds': 0.0, 'peak_bytes': 0})
+        total['calls'] += 1
+        total['rows'] += record['rows'] or 0
+        total['seconds'] = round(total['seconds'] + record['seconds'], 6)
+        total['peak_bytes'] = max(total['peak_bytes'], record['peak_bytes'])
+    return totals
+
+
+def write_trace():
+    """Write the recorded stages as JSON (called automatically at exit)"""
+    if _trace is None or not _trace['stages']:
+        return
+
+    report = {
+        'script': _trace['script'],
+        'started': _trace['started'],
+        'stages': _trace['stages'],
+        'totals': summarize(_trace['stages'])
+    }
+    with open(_trace['output_path'], 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Pipeline trace saved to: {_trace['output_path']}")
+    _trace['stages'] = []
+
+
+if os.environ.get('PIPELINE_TRACE'):
+    enable(os.environ['PIPELINE_TRACE'])
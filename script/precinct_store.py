@@ -0,0 +1,146 @@
+"""
+Compact, column-oriented precinct-level result store
+
+Precinct rows (county, precinct, office, district, party, candidate, votes) are
+saved as a compressed .npz file: every text column is dictionary-encoded into
+int32 codes plus a value table, and votes are int32. County totals are rolled
+up lazily and materialized next to the store as <name>.county.npz, which is
+rebuilt whenever the store file changes.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PRECINCT_STORE_FORMAT = "ohio-precinct-v1"
+
+# Dictionary-encoded text columns, in on-disk order
+CODED_COLUMNS = ['county', 'precinct', 'office', 'district', 'party', 'candidate']
+
+# Columns that identify a county-level result row
+COUNTY_KEYS = ['county', 'office', 'district', 'party', 'candidate']
+
+
+def encode_columns(df, columns):
+    """Dictionary-encode text columns into {name_codes, name_values} arrays"""
+    arrays = {}
+    for column in columns:
+        codes, values = pd.factorize(df[column].fillna('').astype(str), sort=True)
+        arrays[f'{column}_codes'] = codes.astype(np.int32)
+        arrays[f'{column}_values'] = np.asarray(values, dtype=str)
+    return arrays
+
+
+def decode_columns(arrays, columns):
+    """Rebuild a DataFrame with categorical text columns from encoded arrays"""
+    return pd.DataFrame({
+        column: pd.Categorical.from_codes(arrays[f'{column}_codes'], categories=arrays[f'{column}_values'])
+        for column in columns
+    })
+
+
+def write_precinct_store(df, output_file):
+    """
+    Write precinct rows to a store file
+
+    df needs county, precinct, office, district, party, candidate and votes columns.
+    Rows with zero votes are dropped since they do not change any rollup.
+    """
+    df = df[df['votes'] != 0]
+    arrays = encode_columns(df, CODED_COLUMNS)
+    arrays['votes'] = df['votes'].to_numpy(dtype=np.int32)
+    arrays['format'] = np.array(PRECINCT_STORE_FORMAT)
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(output_file, **arrays)
+
+    print(f"  ✓ Saved {len(df):,} precinct rows to: {output_file.name}")
+
+
+class PrecinctStore:
+    """Precinct rows loaded from a store file, with a cached county rollup"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with np.load(self.path) as data:
+            if str(data['format']) != PRECINCT_STORE_FORMAT:
+                raise ValueError(f"Unsupported precinct store format: {data['format']}")
+            self.arrays = {name: data[name] for name in data.files}
+        self._county_totals = None
+
+    def __len__(self):
+        return len(self.arrays['votes'])
+
+    @property
+    def rollup_path(self):
+        return self.path.with_name(f"{self.path.stem}.county.npz")
+
+    def frame(self):
+        """All precinct rows as a DataFrame with categorical text columns"""
+        df = decode_columns(self.arrays, CODED_COLUMNS)
+        df['votes'] = self.arrays['votes']
+        return df
+
+    def precincts(self, county=None, office=None):
+        """Precinct rows, optionally filtered to one county and/or office"""
+        mask = np.ones(len(self), dtype=bool)
+        for column, value in (('county', county), ('office', office)):
+            if value is None:
+                continue
+            values = self.arrays[f'{column}_values']
+            matches = np.flatnonzero(values == value)
+            if len(matches) == 0:
+                mask[:] = False
+            else:
+                mask &= self.arrays[f'{column}_codes'] == matches[0]
+
+        df = decode_columns({k: v[mask] if k.endswith('_codes') else v for k, v in self.arrays.items()},
+                            CODED_COLUMNS)
+        df['votes'] = self.arrays['votes'][mask]
+        return df
+
+    def _source_signature(self):
+        stat = self.path.stat()
+        return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    def _load_rollup(self):
+        """Read the materialized rollup if it was built from the current store file"""
+        if not self.rollup_path.exists():
+            return None
+        with np.load(self.rollup_path) as data:
+            if not np.array_equal(data['source_signature'], self._source_signature()):
+                return None
+            arrays = {name: data[name] for name in data.files}
+        df = decode_columns(arrays, COUNTY_KEYS)
+        df['votes'] = arrays['votes']
+        return df
+
+    def _build_rollup(self):
+        """Sum precinct votes by county key using the integer codes"""
+        codes = pd.DataFrame({column: self.arrays[f'{column}_codes'] for column in COUNTY_KEYS})
+        codes['votes'] = self.arrays['votes'].astype(np.int64)
+        totals = codes.groupby(COUNTY_KEYS, as_index=False, sort=True)['votes'].sum()
+
+        arrays = {f'{column}_codes': totals[column].to_numpy(dtype=np.int32) for column in COUNTY_KEYS}
+        arrays.update({f'{column}_values': self.arrays[f'{column}_values'] for column in COUNTY_KEYS})
+        arrays['votes'] = totals['votes'].to_numpy(dtype=np.int64)
+        arrays['source_signature'] = self._source_signature()
+        np.savez_compressed(self.rollup_path, **arrays)
+
+        df = decode_columns(arrays, COUNTY_KEYS)
+        df['votes'] = arrays['votes']
+        return df
+
+    def county_totals(self):
+        """
+        County-level totals in consolidated-CSV shape
+
+        Computed on first use, then served from memory or the materialized
+        <name>.county.npz rollup until the store file changes.
+        """
+        if self._county_totals is None:
+            self._county_totals = self._load_rollup()
+        if self._county_totals is None:
+            self._county_totals = self._build_rollup()
+        return self._county_totals
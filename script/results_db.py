@@ -0,0 +1,259 @@
+"""
+SQLite database of Ohio results with a small query CLI
+
+data/ohio_results.sqlite holds the raw consolidated rows (results) and the
+computed county contest results (contests), indexed on (year, office,
+district, county) and (county, office, year). Offices are stored under their
+canonical names. The database is rebuilt one year at a time: a year is only
+reloaded when its consolidated CSV's content hash changes.
+
+    python script/results_db.py build
+    python script/results_db.py margin --county Mahoning --office President
+    python script/results_db.py swing --office President --from 2012 --to 2024
+    python script/results_db.py share --year 2024 --office President --county Trumbull
+"""
+import argparse
+import contextlib
+import io
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from consolidated import load_consolidated
+from election_results import canonical_office
+from transform_election_data import file_content_hash, process_openelections_csv
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEFAULT_DB_FILE = DATA_DIR / "ohio_results.sqlite"
+
+# Bump when the table layout changes; older databases are rebuilt from scratch
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    year INTEGER PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    result_rows INTEGER NOT NULL,
+    contest_rows INTEGER NOT NULL,
+    built TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    year INTEGER NOT NULL,
+    county TEXT NOT NULL,
+    office TEXT NOT NULL,
+    source_office TEXT NOT NULL,
+    district TEXT NOT NULL,
+    party TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+    votes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contests (
+    year INTEGER NOT NULL,
+    county TEXT NOT NULL,
+    office TEXT NOT NULL,
+    source_office TEXT NOT NULL,
+    district TEXT NOT NULL,
+    contest TEXT NOT NULL,
+    dem_candidate TEXT,
+    rep_candidate TEXT,
+    dem_votes INTEGER NOT NULL,
+    rep_votes INTEGER NOT NULL,
+    other_votes INTEGER NOT NULL,
+    total_votes INTEGER NOT NULL,
+    margin INTEGER NOT NULL,
+    margin_pct REAL NOT NULL,
+    winner TEXT NOT NULL,
+    competitiveness TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_year_office ON results (year, office, district, county);
+CREATE INDEX IF NOT EXISTS results_county_office ON results (county, office, year);
+CREATE INDEX IF NOT EXISTS contests_year_office ON contests (year, office, district, county);
+CREATE INDEX IF NOT EXISTS contests_county_office ON contests (county, office, year);
+"""
+
+
+def connect(db_file=DEFAULT_DB_FILE):
+    """Open the database, creating (or recreating, on a schema change) its tables"""
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        for table in ('builds', 'results', 'contests'):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    return conn
+
+
+def normalize_district(value):
+    """'' for statewide contests, otherwise the district without a trailing .0"""
+    if value is None or value != value:
+        return ''
+    return re.sub(r'\.0$', '', str(value).strip())
+
+
+def result_rows(year, csv_file):
+    """Raw consolidated rows for a year as tuples for the results table"""
+    df = load_consolidated(year, base_dir=csv_file.parent)
+    for row in df.itertuples(index=False):
+        source_office = str(row.office)
+        yield (int(year), str(row.county), canonical_office(source_office), source_office,
+               normalize_district(row.district), '' if row.party != row.party else str(row.party),
+               '' if row.candidate != row.candidate else str(row.candidate), int(row.votes))
+
+
+def contest_rows(year, csv_file):
+    """Computed county contest results for a year as tuples for the contests table"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        contests = process_openelections_csv(csv_file, str(year))
+    for contest_key, contest in contests.items():
+        for county, r in contest['results'].items():
+            yield (int(year), county, canonical_office(contest['office']), contest['office'],
+                   normalize_district(contest['district']), contest_key,
+                   r['dem_candidate'], r['rep_candidate'], r['dem_votes'], r['rep_votes'], r['other_votes'],
+                   r['total_votes'], r['margin'], r['margin_pct'], r['winner'], r['competitiveness'])
+
+
+def build_database(db_file=DEFAULT_DB_FILE, base_dir=DATA_DIR, force=False):
+    """Load every changed year into the database and drop years whose CSV is gone"""
+    conn = connect(db_file)
+    built = {row['year']: row['source_hash'] for row in conn.execute("SELECT year, source_hash FROM builds")}
+
+    year_files = {}
+    for csv_file in sorted(Path(base_dir).glob("*__oh__general__consolidated.csv")):
+        year_match = re.match(r'^(\d{4})__oh__general__consolidated\.csv$', csv_file.name)
+        if year_match:
+            year_files[int(year_match.group(1))] = csv_file
+
+    for year in sorted(set(built) - set(year_files)):
+        with conn:
+            for table in ('results', 'contests', 'builds'):
+                conn.execute(f"DELETE FROM {table} WHERE year = ?", (year,))
+        print(f"  ✓ {year}: removed (no consolidated file)")
+
+    for year, csv_file in year_files.items():
+        source_hash = file_content_hash(csv_file)
+        if not force and built.get(year) == source_hash:
+            print(f"  ✓ {year}: up to date")
+            continue
+
+        # Replace the whole year in one transaction so readers never see half a year
+        with conn:
+            for table in ('results', 'contests'):
+                conn.execute(f"DELETE FROM {table} WHERE year = ?", (year,))
+            results = list(result_rows(year, csv_file))
+            contests = list(contest_rows(year, csv_file))
+            conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", results)
+            conn.executemany("INSERT INTO contests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             contests)
+            conn.execute("INSERT OR REPLACE INTO builds VALUES (?, ?, ?, ?, ?, ?)",
+                         (year, csv_file.name, source_hash, len(results), len(contests),
+                          datetime.now().isoformat(timespec='seconds')))
+        print(f"  ✓ {year}: {len(results):,} result rows, {len(contests):,} contest rows")
+
+    conn.close()
+    print(f"Database saved to: {db_file}")
+
+
+def query_margins(conn, county, office, years=None):
+    """A county's contest margins for an office, oldest year first"""
+    sql = ("SELECT year, contest, dem_candidate, rep_candidate, dem_votes, rep_votes, total_votes, "
+           "margin_pct, winner FROM contests WHERE county = ? AND office = ?")
+    params = [county, canonical_office(office)]
+    if years:
+        sql += f" AND year IN ({', '.join('?' * len(years))})"
+        params.extend(int(year) for year in years)
+    return conn.execute(sql + " ORDER BY year, contest", params).fetchall()
+
+
+def query_swing(conn, office, from_year, to_year, county=None):
+    """Per-county change in margin_pct (positive = toward REP) between two years"""
+    sql = ("SELECT a.county, a.district, a.margin_pct AS from_margin, b.margin_pct AS to_margin, "
+           "b.margin_pct - a.margin_pct AS swing "
+           "FROM contests a JOIN contests b "
+           "ON b.county = a.county AND b.office = a.office AND b.district = a.district "
+           "WHERE a.office = ? AND a.year = ? AND b.year = ?")
+    params = [canonical_office(office), int(from_year), int(to_year)]
+    if county:
+        sql += " AND a.county = ?"
+        params.append(county)
+    return conn.execute(sql + " ORDER BY swing DESC, a.county", params).fetchall()
+
+
+def query_vote_share(conn, year, office, county=None, district=None):
+    """Candidate vote shares within each county for one year and office"""
+    sql = ("SELECT county, district, candidate, party, SUM(votes) AS votes, "
+           "100.0 * SUM(votes) / SUM(SUM(votes)) OVER (PARTITION BY county, district) AS share "
+           "FROM results WHERE year = ? AND office = ?")
+    params = [int(year), canonical_office(office)]
+    if county:
+        sql += " AND county = ?"
+        params.append(county)
+    if district is not None:
+        sql += " AND district = ?"
+        params.append(normalize_district(district))
+    sql += " GROUP BY county, district, candidate, party ORDER BY county, district, votes DESC"
+    return conn.execute(sql, params).fetchall()
+
+
+def format_margin(margin_pct):
+    return f"R+{margin_pct:.2f}%" if margin_pct > 0 else f"D+{-margin_pct:.2f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the Ohio results SQLite database")
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB_FILE, help="Database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Load changed years from the consolidated CSVs")
+    build.add_argument('--force', action='store_true', help="Reload every year")
+
+    margin = commands.add_parser('margin', help="A county's margins for an office across years")
+    margin.add_argument('--county', required=True)
+    margin.add_argument('--office', required=True)
+    margin.add_argument('--year', action='append', help="Limit to a year (repeatable)")
+
+    swing = commands.add_parser('swing', help="Per-county margin change between two years")
+    swing.add_argument('--office', required=True)
+    swing.add_argument('--from', dest='from_year', required=True)
+    swing.add_argument('--to', dest='to_year', required=True)
+    swing.add_argument('--county')
+
+    share = commands.add_parser('share', help="Candidate vote shares for a year and office")
+    share.add_argument('--year', required=True)
+    share.add_argument('--office', required=True)
+    share.add_argument('--county')
+    share.add_argument('--district')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_database(args.db, force=args.force)
+        return
+
+    if not args.db.exists():
+        parser.error(f"{args.db} not found - run 'build' first")
+    conn = connect(args.db)
+
+    if args.command == 'margin':
+        for row in query_margins(conn, args.county, args.office, args.year):
+            print(f"{row['year']}  {row['contest']}: {format_margin(row['margin_pct'])}  "
+                  f"({row['dem_candidate']} {row['dem_votes']:,} / {row['rep_candidate']} {row['rep_votes']:,} "
+                  f"of {row['total_votes']:,})")
+    elif args.command == 'swing':
+        for row in query_swing(conn, args.office, args.from_year, args.to_year, args.county):
+            label = f"{row['county']} (District {row['district']})" if row['district'] else row['county']
+            print(f"{label}: {format_margin(row['from_margin'])} -> {format_margin(row['to_margin'])}  "
+                  f"swing {row['swing']:+.2f}")
+    elif args.command == 'share':
+        for row in query_vote_share(conn, args.year, args.office, args.county, args.district):
+            label = f"{row['county']} (District {row['district']})" if row['district'] else row['county']
+            print(f"{label}: {row['candidate']} ({row['party'] or '-'}) {row['votes']:,} votes, {row['share']:.2f}%")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
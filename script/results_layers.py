@@ -0,0 +1,154 @@
+"""
+Results tables pre-joined to the county geometry
+
+For every year, writes data/layers/<year>.json holding one table per contest
+whose arrays are aligned to the feature order of ohio_counties.geojson (and
+the simplified levels and TopoJSON, which keep the same order): entry i of
+every array belongs to feature i. The map can then switch year or contest by
+swapping feature properties from a table instead of re-joining results to
+features by county name. Counties without a result in a contest are null.
+
+data/layers/manifest.json lists the feature order (names and GEOIDs), the
+competitiveness code table the category indexes refer to, and the contests
+in each year's file.
+"""
+import argparse
+import json
+import re
+from pathlib import Path
+
+from county_geometry import SOURCE_GEOJSON
+from transform_election_data import COMPETITIVENESS_PALETTE
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+RESULTS_FILE = DATA_DIR / "ohio_election_results.json"
+LAYERS_DIR = DATA_DIR / "layers"
+
+LAYERS_FORMAT = "ohio-layers-v1"
+
+# Competitiveness codes in palette order; tables store the index into this list
+CATEGORY_CODES = list(COMPETITIVENESS_PALETTE)
+
+# Per-county columns copied from each result record
+VALUE_COLUMNS = ['margin_pct', 'dem_votes', 'rep_votes', 'other_votes', 'total_votes']
+
+
+def normalize_county_name(name):
+    """Match county names the way index.html does (letters, digits, '.', '-', upper case)"""
+    name = re.sub(r'[^a-z0-9 .\-]', '', str(name or ''), flags=re.IGNORECASE)
+    return re.sub(r'\s+', ' ', name).strip().upper()
+
+
+def feature_keys(collection):
+    """County names and GEOIDs in feature order"""
+    names = []
+    geoids = []
+    for feature in collection['features']:
+        props = feature.get('properties') or {}
+        names.append(props.get('NAME20') or props.get('NAMELSAD20') or '')
+        geoids.append(props.get('GEOID20'))
+    return names, geoids
+
+
+def contest_table(contest, feature_index):
+    """
+    One contest's results as arrays aligned to feature order
+
+    Returns (table, unmatched county names).
+    """
+    size = len(feature_index)
+    table = {'contest_name': contest['contest_name'], 'office': contest['office'], 'district': contest['district']}
+    columns = {column: [None] * size for column in VALUE_COLUMNS}
+    categories = [None] * size
+    dem_candidates = {}
+    rep_candidates = {}
+    unmatched = []
+
+    for county, record in contest['results'].items():
+        index = feature_index.get(normalize_county_name(county))
+        if index is None:
+            unmatched.append(county)
+            continue
+        for column in VALUE_COLUMNS:
+            columns[column][index] = record[column]
+        categories[index] = CATEGORY_CODES.index(record['competitiveness'])
+        dem_candidates[record['dem_candidate']] = dem_candidates.get(record['dem_candidate'], 0) + 1
+        rep_candidates[record['rep_candidate']] = rep_candidates.get(record['rep_candidate'], 0) + 1
+
+    # A contest has one candidate per party; take the most common in case a county record differs
+    table['dem_candidate'] = max(dem_candidates, key=dem_candidates.get) if dem_candidates else None
+    table['rep_candidate'] = max(rep_candidates, key=rep_candidates.get) if rep_candidates else None
+    table.update(columns)
+    table['category'] = categories
+    return table, unmatched
+
+
+def build_layers(geojson_file=SOURCE_GEOJSON, results_file=RESULTS_FILE, output_dir=LAYERS_DIR):
+    """Write one pre-joined results file per year plus the manifest; returns the manifest"""
+    with open(geojson_file, 'r', encoding='utf-8') as f:
+        collection = json.load(f)
+    with open(results_file, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+
+    names, geoids = feature_keys(collection)
+    feature_index = {normalize_county_name(name): i for i, name in enumerate(names)}
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'format': LAYERS_FORMAT,
+        'geometry': Path(geojson_file).name,
+        'counties': names,
+        'geoids': geoids,
+        'category_codes': CATEGORY_CODES,
+        'competitiveness_palette': COMPETITIVENESS_PALETTE,
+        'years': {}
+    }
+    written = set()
+    unmatched = set()
+
+    for year, office_groups in document['results_by_year'].items():
+        layer = {'format': LAYERS_FORMAT, 'year': year, 'contests': {}}
+        offices = {}
+        for office, contests in office_groups.items():
+            layer['contests'][office] = {}
+            for contest_key, contest in contests.items():
+                table, missing = contest_table(contest, feature_index)
+                layer['contests'][office][contest_key] = table
+                unmatched.update(missing)
+            offices[office] = list(contests.keys())
+
+        layer_path = output_dir / f"{year}.json"
+        with open(layer_path, 'w', encoding='utf-8') as f:
+            json.dump(layer, f, ensure_ascii=False, separators=(',', ':'))
+        written.add(layer_path)
+        manifest['years'][year] = {'path': layer_path.name, 'offices': offices}
+        print(f"  ✓ {year}: {sum(len(c) for c in offices.values())} contests, "
+              f"{layer_path.stat().st_size / 1024:.0f} KB")
+
+    # Drop layers for years that are no longer in the results
+    for stale in output_dir.glob("[0-9][0-9][0-9][0-9].json"):
+        if stale not in written:
+            stale.unlink()
+
+    with open(output_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    if unmatched:
+        print(f"⚠ Counties with no matching feature: {sorted(unmatched)}")
+    print(f"Layers for {len(written)} year(s) and manifest saved to: {output_dir}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write results tables aligned to the county feature order")
+    parser.add_argument('--geojson', type=Path, default=SOURCE_GEOJSON)
+    parser.add_argument('--results', type=Path, default=RESULTS_FILE)
+    parser.add_argument('--output-dir', type=Path, default=LAYERS_DIR)
+    args = parser.parse_args()
+
+    build_layers(args.geojson, args.results, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Run the data build as a dependency graph of stages
+
+Each stage is one of the pipeline scripts with declared inputs and outputs.
+A stage runs only when an input changed (by content hash), an output is
+missing, or an output was rewritten since the stage last produced it.
+Stages whose dependencies are done run concurrently, and the critical path
+(the longest chain of dependent stage times) is reported at the end.
+"""
+import argparse
+import ast
+import fnmatch
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+STATE_FILE = ROOT_DIR / "data" / ".pipeline_state.json"
+SCRIPT_DIR = ROOT_DIR / "script"
+
+# name, script (and args), inputs (globs relative to the repo root), outputs, extra ordering deps.
+# The script and every script/ module it imports are added to the inputs (see stage_inputs),
+# so a code change reruns the stage; only data files need listing here.
+STAGES = [
+    {
+        'name': 'convert_to_openelections',
+        'script': 'script/convert_to_openelections.py',
+        'inputs': ['data/2022 Statewide Offices.csv', 'data/2022 Supreme Court.csv', 'data/2022 U.S. Congress.csv',
+                   'data/2024 President and Vice President.csv', 'data/2024 Justice of the Supreme Court.csv',
+                   'data/2024 U.S. Congress.csv', 'script/office_inference.json'],
+        'outputs': ['data/2022__oh__general__consolidated.csv', 'data/2024__oh__general__consolidated.csv'],
+    },
+    {
+        'name': 'convert_openelections_to_consolidated',
+        'script': 'script/convert_openelections_to_consolidated.py',
+        'inputs': ['data/20??????__oh__general*.csv'],
+        'outputs': ['data/2000__oh__general__consolidated.csv', 'data/2002__oh__general__consolidated.csv',
+                    'data/2008__oh__general__consolidated.csv', 'data/2012__oh__general__consolidated.csv',
+                    'data/2014__oh__general__consolidated.csv', 'data/2016__oh__general__consolidated.csv'],
+    },
+    {
+        'name': 'convert_2004_to_openelections',
+        'script': 'script/convert_2004_to_openelections.py',
+        'inputs': ['data/2004 Candidate Name List.csv', 'data/2004 Election Results.csv'],
+        'outputs': ['data/2004__oh__general__consolidated.csv'],
+    },
+    {
+        # Upserts into consolidated files, so it runs after the converters that write them
+        'name': 'supplements',
+        'script': 'script/supplements.py',
+        'inputs': [],
+        'outputs': ['data/2010__oh__general__consolidated.csv'],
+        'after': ['convert_openelections_to_consolidated'],
+    },
+    {
+        'name': 'transform_election_data',
+        'script': 'script/transform_election_data.py',
+        'inputs': ['data/*__oh__general__consolidated.csv'],
+        'outputs': ['data/ohio_election_results.json'],
+    },
+    {
+        'name': 'results_db',
+        'script': 'script/results_db.py',
+        'args': ['build'],
+        'inputs': ['data/*__oh__general__consolidated.csv'],
+        'outputs': ['data/ohio_results.sqlite'],
+    },
+    {
+        'name': 'create_geojson',
+        'script': 'script/create_geojson.py',
+        'inputs': ['data/tl_2020_39_county20/*'],
+        'outputs': ['data/ohio_counties.geojson', 'data/counties/manifest.json', 'data/county_index.json'],
+    },
+    {
+        'name': 'results_layers',
+        'script': 'script/results_layers.py',
+        'inputs': ['data/ohio_counties.geojson', 'data/ohio_election_results.json'],
+        'outputs': ['data/layers/manifest.json'],
+    },
+]
+
+
+def script_sources(script):
+    """Repo-relative paths of a script and every script/ module it imports, transitively"""
+    sources = []
+    pending = [ROOT_DIR / script]
+    while pending:
+        path = pending.pop()
+        relative = path.relative_to(ROOT_DIR).as_posix()
+        if relative in sources:
+            continue
+        sources.append(relative)
+
+        # Imports anywhere in the file count, including the lazy ones inside functions
+        for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'), filename=str(path))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = SCRIPT_DIR / f"{name.split('.')[0]}.py"
+                if module.exists():
+                    pending.append(module)
+    return sorted(sources)
+
+
+def stage_inputs(stage):
+    """A stage's declared inputs plus its script's sources"""
+    return stage['inputs'] + script_sources(stage['script'])
+
+
+def stage_dependencies(stages):
+    """Map each stage to the stages it waits for (producers of its inputs, plus 'after')"""
+    deps = {}
+    for stage in stages:
+        needs = set(stage.get('after', []))
+        for other in stages:
+            if other is stage:
+                continue
+            if any(fnmatch.fnmatch(output, pattern) for output in other['outputs'] for pattern in stage_inputs(stage)):
+                needs.add(other['name'])
+        deps[stage['name']] = needs
+    return deps
+
+
+def load_state(state_file=STATE_FILE):
+    if state_file.exists():
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'files': {}, 'stages': {}}
+
+
+def save_state(state, state_file=STATE_FILE):
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def file_hash(path, state):
+    """Content hash of a file, reused while its size and mtime are unchanged"""
+    stat = path.stat()
+    key = str(path.relative_to(ROOT_DIR))
+    cached = state['files'].get(key)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    state['files'][key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def fingerprint(patterns, state, exclude=()):
+    """Combined hash of every file matching the patterns (missing files count as absent)"""
+    paths = set()
+    for pattern in patterns:
+        paths.update(p for p in ROOT_DIR.glob(pattern) if p.is_file())
+    paths -= {ROOT_DIR / path for path in exclude}
+
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(str(path.relative_to(ROOT_DIR)).encode('utf-8'))
+        digest.update(file_hash(path, state).encode('ascii'))
+    return digest.hexdigest()
+
+
+def stale_reason(stage, state):
+    """Why a stage needs to run, or None if its outputs are current"""
+    record = state['stages'].get(stage['name'])
+    if record is None:
+        return "never built"
+    if any(not (ROOT_DIR / output).exists() for output in stage['outputs']):
+        return "output missing"
+    if fingerprint(stage_inputs(stage), state, exclude=stage['outputs']) != record['inputs']:
+        return "inputs changed"
+    if fingerprint(stage['outputs'], state) != record['outputs']:
+        return "outputs changed since last build"
+    return None
+
+
+def run_stage(stage):
+    """Run a stage's script, returning (returncode, seconds, combined output)"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(ROOT_DIR / stage['script']), *stage.get('args', [])], cwd=ROOT_DIR,
+                          capture_output=True, text=True)
+    return proc.returncode, time.perf_counter() - start, proc.stdout + proc.stderr
+
+
+def critical_path(durations, deps):
+    """(seconds, [stage names]) for the longest chain of dependent stage times"""
+    finish = {}
+    via = {}
+
+    def finish_time(name):
+        if name not in finish:
+            before = max(deps[name], key=finish_time, default=None)
+            finish[name] = durations.get(name, 0.0) + (finish_time(before) if before else 0.0)
+            via[name] = before
+        return finish[name]
+
+    end = max(deps, key=finish_time)
+    path = []
+    while end is not None:
+        path.append(end)
+        end = via[end]
+    return finish[path[0]], path[::-1]
+
+
+def run_pipeline(jobs=1, force=False, dry_run=False, verbose=False, stages=STAGES):
+    """Run every stale stage in dependency order; returns True if nothing failed"""
+    by_name = {stage['name']: stage for stage in stages}
+    deps = stage_dependencies(stages)
+    state = load_state()
+
+    pending = set(by_name)
+    done = set()
+    failed = set()
+    ran = set()
+    durations = {}
+    running = {}
+    wall_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        while pending or running:
+            for name in sorted(pending):
+                if not deps[name] <= done | failed:
+                    continue
+                pending.discard(name)
+                stage = by_name[name]
+
+                if deps[name] & failed:
+                    print(f"⚠ {name}: skipped (dependency failed)")
+                    failed.add(name)
+                    continue
+
+                reason = "forced" if force else None
+                if reason is None and deps[name] & ran:
+                    reason = "upstream rebuilt"
+                if reason is None:
+                    reason = stale_reason(stage, state)
+                if reason is None:
+                    print(f"✓ {name}: up to date")
+                    done.add(name)
+                    continue
+
+                if dry_run:
+                    print(f"  {name}: would run ({reason})")
+                    done.add(name)
+                    ran.add(name)
+                    continue
+
+                # Hash inputs before the stage runs so edits made during the run count as changes
+                inputs = fingerprint(stage_inputs(stage), state, exclude=stage['outputs'])
+                print(f"→ {name}: running ({reason})")
+                running[pool.submit(run_stage, stage)] = (name, inputs)
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, inputs = running.pop(future)
+                returncode, seconds, output = future.result()
+                durations[name] = seconds
+                if verbose or returncode != 0:
+                    print(output.rstrip())
+                if returncode != 0:
+                    print(f"⚠ {name}: failed after {seconds:.2f}s (exit {returncode})")
+                    failed.add(name)
+                    continue
+
+                state['stages'][name] = {
+                    'inputs': inputs,
+                    'outputs': fingerprint(by_name[name]['outputs'], state),
+                    'seconds': round(seconds, 3),
+                    'built': time.strftime("%Y-%m-%dT%H:%M:%S")
+                }
+                save_state(state)
+                print(f"✓ {name}: done in {seconds:.2f}s")
+                done.add(name)
+                ran.add(name)
+
+    if not dry_run:
+        save_state(state)
+
+    wall = time.perf_counter() - wall_start
+    if dry_run:
+        print(f"\n{len(ran)} stage(s) would run")
+    elif durations:
+        path_seconds, path = critical_path(durations, deps)
+        print(f"\nRan {len(durations)} stage(s) in {wall:.2f}s wall, {sum(durations.values()):.2f}s total stage time")
+        print(f"Critical path ({path_seconds:.2f}s): {' -> '.join(name for name in path if name in durations)}")
+    else:
+        print(f"\nNothing to run ({wall:.2f}s)")
+
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the stale stages of the election data build")
+    parser.add_argument('--jobs', type=int, default=2, help="Stages to run concurrently (default: 2)")
+    parser.add_argument('--force', action='store_true', help="Run every stage regardless of staleness")
+    parser.add_argument('--dry-run', action='store_true', help="List the stages that would run")
+    parser.add_argument('--verbose', action='store_true', help="Print each stage's output")
+    args = parser.parse_args()
+
+    ok = run_pipeline(jobs=args.jobs, force=args.force, dry_run=args.dry_run, verbose=args.verbose)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Keyed upserts of manually entered results into the consolidated files
+
+A supplement is a list of consolidated rows for one year. Rows are keyed on
+(year, county, office, district, candidate): the year picks the partition
+({year}__oh__general__consolidated.csv) and the rest identify a row inside it.
+Applying a supplement replaces matching rows and adds missing ones, and the
+file is only rewritten when something changed, so supplements can be applied
+on every build.
+"""
+import pandas as pd
+
+from consolidated import CONSOLIDATED_COLUMNS, DATA_DIR, consolidated_path, read_consolidated, write_consolidated
+
+# Columns that identify a row within a year's consolidated file
+SUPPLEMENT_KEY = ['county', 'office', 'district', 'candidate']
+
+
+def supplement_keys(df):
+    """Row keys with districts normalized so '', NaN, '3' and 3.0 compare as expected"""
+    keys = df[SUPPLEMENT_KEY].astype(object).fillna('').astype(str)
+    keys['district'] = keys['district'].str.replace(r'\.0$', '', regex=True)
+    return pd.MultiIndex.from_frame(keys)
+
+
+def upsert_supplement(year, rows, name=None, base_dir=DATA_DIR):
+    """
+    Merge supplement rows into a year's consolidated file
+
+    Returns counts of inserted, updated and unchanged rows. Existing rows that
+    share a key with the supplement (including duplicates left by older
+    append-only scripts) are replaced by the supplement row.
+    """
+    name = name or f"{year} supplement"
+    supplement = pd.DataFrame(rows, columns=CONSOLIDATED_COLUMNS)
+    new_keys = supplement_keys(supplement)
+    if new_keys.has_duplicates:
+        duplicates = new_keys[new_keys.duplicated()].unique().tolist()
+        raise ValueError(f"{name} has duplicate keys: {duplicates[:5]}")
+
+    path = consolidated_path(year, base_dir)
+    if path.exists():
+        # Party codes are left as written so untouched rows round-trip unchanged
+        existing = read_consolidated(path, normalize_parties=False)
+    else:
+        print(f"  ⚠ {path.name} not found - starting it from {name}")
+        existing = pd.DataFrame(columns=CONSOLIDATED_COLUMNS)
+
+    existing_keys = supplement_keys(existing)
+    matched = existing_keys.isin(new_keys)
+
+    # A key is unchanged when exactly one existing row has the same party and votes
+    old = pd.DataFrame({'party': existing['party'].astype(object).fillna('').astype(str).to_numpy(),
+                        'votes': existing['votes'].to_numpy()}, index=existing_keys)[matched]
+    old_counts = old.index.value_counts().reindex(new_keys, fill_value=0).to_numpy()
+    old = old[~old.index.duplicated()].reindex(new_keys)
+
+    present = old_counts > 0
+    same = ((old_counts == 1)
+            & (old['party'].to_numpy() == supplement['party'].fillna('').astype(str).to_numpy())
+            & (old['votes'].to_numpy() == supplement['votes'].to_numpy()))
+    unchanged = int(same.sum())
+    updated = int(present.sum()) - unchanged
+    inserted = len(supplement) - unchanged - updated
+    result = {'inserted': inserted, 'updated': updated, 'unchanged': unchanged}
+
+    if inserted == 0 and updated == 0:
+        print(f"  ✓ {name}: {unchanged} rows already up to date")
+        return result
+
+    combined = pd.concat([existing[~matched], supplement], ignore_index=True)
+    write_consolidated(combined, path, year)
+
+    print(f"  ✓ {name}: {inserted} inserted, {updated} updated, {unchanged} unchanged -> {path.name}")
+    return result
+
+
+def registered_supplements():
+    """(name, year, rows) for every manual data set applied during a build"""
+    from add_2010_senate import senate_2010_rows
+
+    return [
+        ('2010 U.S. Senate', '2010', senate_2010_rows()),
+    ]
+
+
+def apply_supplements(base_dir=DATA_DIR):
+    """Upsert every registered supplement"""
+    print("Applying manual supplements...")
+    for name, year, rows in registered_supplements():
+        upsert_supplement(year, rows, name=name, base_dir=base_dir)
+
+
+if __name__ == "__main__":
+    apply_supplements()
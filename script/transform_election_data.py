@@ -2,77 +2,176 @@
 Transform Ohio election data from OpenElections format into nested JSON format
 """
 import pandas as pd
+import numpy as np
 import json
+import hashlib
+import argparse
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import re
 
+from consolidated import read_consolidated
+from columnar_results import write_columnar_results
+from pipeline_trace import stage
 
-def get_competitiveness(margin_pct):
-    """Determine competitiveness category based on margin percentage"""
-    abs_margin = abs(margin_pct)
-    
-    # Match exact thresholds from visualization
-    if abs_margin >= 40:
-        category = "Annihilation"
-        code_suffix = "ANNIHILATION"
-        r_color = "#67000d"
-        d_color = "#08306b"
-    elif abs_margin >= 30:
-        category = "Dominant"
-        code_suffix = "DOMINANT"
-        r_color = "#a50f15"
-        d_color = "#08519c"
-    elif abs_margin >= 20:
-        category = "Stronghold"
-        code_suffix = "STRONGHOLD"
-        r_color = "#cb181d"
-        d_color = "#3182bd"
-    elif abs_margin >= 10:
-        category = "Safe"
-        code_suffix = "SAFE"
-        r_color = "#ef3b2c"
-        d_color = "#6baed6"
-    elif abs_margin >= 5.5:
-        category = "Likely"
-        code_suffix = "LIKELY"
-        r_color = "#fb6a4a"
-        d_color = "#9ecae1"
-    elif abs_margin >= 1.0:
-        category = "Lean"
-        code_suffix = "LEAN"
-        r_color = "#fcae91"
-        d_color = "#c6dbef"
-    elif abs_margin >= 0.5:
-        category = "Tilt"
-        code_suffix = "TILT"
-        r_color = "#fee8c8"
-        d_color = "#e1f5fe"
-    else:
-        category = "Tossup"
-        code_suffix = "TOSSUP"
-        r_color = "#f7f7f7"
-        d_color = "#f7f7f7"
-    
-    if margin_pct > 0:
-        party = "Republican"
-        code = f"R_{code_suffix}"
-        color = r_color
-    elif margin_pct < 0:
-        party = "Democratic"
-        code = f"D_{code_suffix}"
-        color = d_color
-    else:
-        party = "Even"
-        code = "TOSSUP"
-        color = "#f7f7f7"
-    
-    return {
-        "category": f"{category} {party}" if party != "Even" else "Tossup",
-        "party": party,
-        "code": code,
-        "color": color
-    }
+# Bump whenever aggregation logic or the per-contest output shape changes so cached years are rebuilt
+TRANSFORMER_VERSION = 2
+
+
+# Competitiveness bands from weakest to strongest: (category, code suffix, R color, D color)
+COMPETITIVENESS_BANDS = [
+    ("Tossup", "TOSSUP", "#f7f7f7", "#f7f7f7"),
+    ("Tilt", "TILT", "#fee8c8", "#e1f5fe"),
+    ("Lean", "LEAN", "#fcae91", "#c6dbef"),
+    ("Likely", "LIKELY", "#fb6a4a", "#9ecae1"),
+    ("Safe", "SAFE", "#ef3b2c", "#6baed6"),
+    ("Stronghold", "STRONGHOLD", "#cb181d", "#3182bd"),
+    ("Dominant", "DOMINANT", "#a50f15", "#08519c"),
+    ("Annihilation", "ANNIHILATION", "#67000d", "#08306b"),
+]
+
+# Lower bound (absolute margin %) of every band after Tossup - match exact thresholds from visualization
+COMPETITIVENESS_THRESHOLDS = np.array([0.5, 1.0, 5.5, 10, 20, 30, 40])
+
+
+def build_competitiveness_palette():
+    """Build the shared code -> category/party/color table written once per JSON file"""
+    palette = {}
+    for category, code_suffix, r_color, d_color in COMPETITIVENESS_BANDS:
+        palette[f"D_{code_suffix}"] = {"category": f"{category} Democratic", "party": "Democratic", "color": d_color}
+        palette[f"R_{code_suffix}"] = {"category": f"{category} Republican", "party": "Republican", "color": r_color}
+    palette["TOSSUP"] = {"category": "Tossup", "party": "Even", "color": "#f7f7f7"}
+    return palette
+
+
+COMPETITIVENESS_PALETTE = build_competitiveness_palette()
+
+# Rows: Democratic margin, even, Republican margin. Columns: band index
+COMPETITIVENESS_CODES = np.array([
+    [f"D_{band[1]}" for band in COMPETITIVENESS_BANDS],
+    ["TOSSUP"] * len(COMPETITIVENESS_BANDS),
+    [f"R_{band[1]}" for band in COMPETITIVENESS_BANDS],
+])
+
+
+def classify_margins(margin_pcts):
+    """Map an array of margin percentages (R minus D) to competitiveness codes"""
+    margins = np.asarray(margin_pcts, dtype=float)
+    bands = np.searchsorted(COMPETITIVENESS_THRESHOLDS, np.abs(margins), side='right')
+    sides = np.sign(margins).astype(int) + 1
+    return COMPETITIVENESS_CODES[sides, bands]
+
+
+def clean_candidate_name(name):
+    """Convert "Last, First" to "First Last" """
+    if ',' in name:
+        parts = name.split(',')
+        return f"{parts[1].strip()} {parts[0].strip()}"
+    return name
+
+
+def aggregate_contests(df, year):
+    """
+    Build per-county contest results in a single grouped pass
+    
+    Candidate totals are summed once over (office, district, county, candidate, party)
+    and then pivoted into DEM/REP/other columns, so the work grows with the number of
+    rows rather than with counties x contests.
+    """
+    
+    df = df[df['office'].notna() & (df['office'] != 'Unknown') & ~df['office'].astype(str).str.isdigit()]
+    # Blank and missing districts both belong to the statewide contest for that office
+    df = df.assign(district=df['district'].astype(object).where(df['district'].notna(), ''))
+    
+    keys = ['office', 'district', 'county']
+    # office, county, party and candidate are categoricals; observed=True keeps every
+    # groupby to the combinations present (pandas < 3 defaults to all category combinations)
+    
+    # Preserve first-appearance ordering of offices, districts and counties
+    order = pd.DataFrame({
+        'office_rank': df.groupby('office', sort=False, observed=True).ngroup(),
+        'district_rank': df.groupby(['office', 'district'], sort=False, observed=True).ngroup(),
+        'county_rank': df.groupby(keys, sort=False, observed=True).ngroup()
+    })
+    order = pd.concat([df[keys], order], axis=1).drop_duplicates(keys)
+    
+    # Group by candidate and party to handle precinct-level data
+    candidate_totals = df.groupby(keys + ['candidate', 'party'], as_index=False, sort=False, observed=True)['votes'].sum()
+    candidate_totals['bucket'] = np.where(
+        candidate_totals['party'] == 'DEM', 'dem',
+        np.where(candidate_totals['party'] == 'REP', 'rep', 'other')
+    )
+    
+    votes = candidate_totals.pivot_table(
+        index=keys, columns='bucket', values='votes', aggfunc='sum', fill_value=0, sort=False, observed=True
+    ).reindex(columns=['dem', 'rep', 'other'], fill_value=0)
+    votes['candidate_count'] = candidate_totals.groupby(keys, sort=False, observed=True).size()
+    
+    # First candidate name per party, matching the sorted groupby order
+    for party, column in (('DEM', 'dem_candidate'), ('REP', 'rep_candidate')):
+        names = candidate_totals[candidate_totals['party'] == party].groupby(keys, sort=False, observed=True)['candidate'].min()
+        votes[column] = names.map(clean_candidate_name)
+    
+    county_totals = votes.reset_index().merge(order, on=keys, how='left')
+    county_totals['total_votes'] = county_totals[['dem', 'rep', 'other']].sum(axis=1)
+    
+    # Require at least two candidates and a non-zero total
+    county_totals = county_totals[(county_totals['candidate_count'] >= 2) & (county_totals['total_votes'] > 0)]
+    county_totals = county_totals.sort_values(['office_rank', 'district_rank', 'county_rank'])
+    
+    dem_votes = county_totals['dem'].to_numpy()
+    rep_votes = county_totals['rep'].to_numpy()
+    total_votes = county_totals['total_votes'].to_numpy()
+    
+    # Calculate percentages based on total votes (including third parties) to match official results
+    dem_pct = (dem_votes / total_votes) * 100
+    rep_pct = (rep_votes / total_votes) * 100
+    margin_pct = rep_pct - dem_pct
+    county_totals = county_totals.assign(
+        margin=rep_votes - dem_votes,
+        margin_pct=np.round(margin_pct, 2),
+        competitiveness=classify_margins(margin_pct)
+    )
+    
+    contests = {}
+    for row in county_totals.itertuples(index=False):
+        office = row.office
+        district = row.district
+        
+        # Create contest key
+        if district and str(district).strip():
+            contest_key = f"{office} - District {district}"
+        else:
+            contest_key = office
+        
+        if contest_key not in contests:
+            contests[contest_key] = {
+                'contest_name': contest_key,
+                'office': office,
+                'district': str(district) if district else '',
+                'results': {}
+            }
+        
+        contests[contest_key]['results'][row.county] = {
+            'county': row.county,
+            'contest': contest_key,
+            'year': year,
+            'dem_candidate': row.dem_candidate if isinstance(row.dem_candidate, str) else "Unknown",
+            'rep_candidate': row.rep_candidate if isinstance(row.rep_candidate, str) else "Unknown",
+            'dem_votes': int(row.dem),
+            'rep_votes': int(row.rep),
+            'other_votes': int(row.other),
+            'total_votes': int(row.total_votes),
+            'two_party_total': int(row.dem + row.rep),
+            'margin': int(row.margin),
+            'margin_pct': float(row.margin_pct),
+            'winner': 'REP' if row.rep > row.dem else 'DEM',
+            'competitiveness': str(row.competitiveness)
+        }
+    
+    return contests
 
 
 def process_openelections_csv(file_path, year):
@@ -84,19 +183,10 @@ def process_openelections_csv(file_path, year):
     
     print(f"Processing: {file_path.name}")
     
-    df = pd.read_csv(file_path)
-    
-    # Standardize party codes
-    party_mapping = {
-        'R': 'REP',
-        'D': 'DEM',
-        'Republican': 'REP',
-        'Democratic': 'DEM',
-        'Democrat': 'DEM',
-        'DEM': 'DEM',
-        'REP': 'REP'
-    }
-    df['party'] = df['party'].map(party_mapping).fillna(df['party'])
+    # Party codes are normalized by the loader
+    with stage('read_csv', file=file_path) as step:
+        df = read_consolidated(file_path)
+        step['rows'] = len(df)
     
     # Filter out only district-based races (State House, State Senate, US House)
     # Keep all statewide offices: Governor, Attorney General, Secretary of State, Treasurer, Auditor, U.S. Senate, President, Supreme Court
@@ -109,112 +199,169 @@ def process_openelections_csv(file_path, year):
     ]
     df = df[~df['office'].isin(district_races)]
     
-    # Group by office and county to get contest results
-    contests = {}
+    with stage('aggregate_contests', file=file_path, rows=len(df)):
+        contests = aggregate_contests(df, year)
     
-    for office in df['office'].unique():
-        if office == 'Unknown' or str(office).isdigit():
-            continue
-            
-        office_df = df[df['office'] == office]
+    print(f"  ✓ Processed {len(contests)} contest(s)")
+    return contests
+
+
+def group_contests_by_office(contests):
+    """Organize a year's contests by office type"""
+    office_groups = {}
+    for contest_key, contest_data in contests.items():
+        office = contest_data['office']
         
-        # For each unique contest (office + district combination)
-        for district in office_df['district'].unique():
-            if pd.isna(district):
-                district = ''
-            
-            district_df = office_df[office_df['district'] == district] if district else office_df[office_df['district'].isna() | (office_df['district'] == '')]
-            
-            # Create contest key
-            if district and str(district).strip():
-                contest_key = f"{office} - District {district}"
-            else:
-                contest_key = office
-            
-            # Get results by county
-            county_results = {}
-            
-            for county in district_df['county'].unique():
-                county_df = district_df[district_df['county'] == county]
-                
-                # Group by candidate and party to handle precinct-level data
-                # This aggregates all precincts for each candidate in the county
-                candidate_totals = county_df.groupby(['candidate', 'party'], as_index=False)['votes'].sum()
-                
-                # Get candidate names
-                dem_candidates = candidate_totals[candidate_totals['party'] == 'DEM']['candidate'].tolist()
-                rep_candidates = candidate_totals[candidate_totals['party'] == 'REP']['candidate'].tolist()
-                
-                # Clean candidate names (convert "Last, First" to "First Last")
-                def clean_name(name):
-                    if ',' in name:
-                        parts = name.split(',')
-                        return f"{parts[1].strip()} {parts[0].strip()}"
-                    return name
-                
-                dem_candidate = clean_name(dem_candidates[0]) if dem_candidates else "Unknown"
-                rep_candidate = clean_name(rep_candidates[0]) if rep_candidates else "Unknown"
-                
-                # Get top 2 candidates by votes
-                top_candidates = candidate_totals.nlargest(2, 'votes')
-                
-                if len(top_candidates) >= 2:
-                    # Sum by party (handles multiple candidates per party or standardized codes)
-                    dem_votes = candidate_totals[candidate_totals['party'] == 'DEM']['votes'].sum()
-                    rep_votes = candidate_totals[candidate_totals['party'] == 'REP']['votes'].sum()
-                    other_votes = candidate_totals[~candidate_totals['party'].isin(['DEM', 'REP'])]['votes'].sum()
-                    
-                    total_votes = candidate_totals['votes'].sum()
-                    two_party_total = dem_votes + rep_votes
-                    
-                    if total_votes > 0:
-                        # Calculate percentages based on total votes (including third parties) to match official results
-                        dem_pct = (dem_votes / total_votes) * 100
-                        rep_pct = (rep_votes / total_votes) * 100
-                        margin_pct = rep_pct - dem_pct
-                        margin = rep_votes - dem_votes
-                        
-                        competitiveness = get_competitiveness(margin_pct)
-                        
-                        county_results[county] = {
-                            'county': county,
-                            'contest': contest_key,
-                            'year': year,
-                            'dem_candidate': dem_candidate,
-                            'rep_candidate': rep_candidate,
-                            'dem_votes': int(dem_votes),
-                            'rep_votes': int(rep_votes),
-                            'other_votes': int(other_votes),
-                            'total_votes': int(total_votes),
-                            'two_party_total': int(two_party_total),
-                            'margin': int(margin),
-                            'margin_pct': round(margin_pct, 2),
-                            'winner': 'REP' if rep_votes > dem_votes else 'DEM',
-                            'competitiveness': {
-                                'category': competitiveness['category'],
-                                'party': competitiveness['party'],
-                                'code': competitiveness['code'],
-                                'color': competitiveness['color']
-                            }
-                        }
+        if office not in office_groups:
+            office_groups[office] = {}
+        
+        office_groups[office][contest_key] = contest_data
+    
+    return office_groups
+
+
+def process_year(file_path, year):
+    """Process one year's consolidated file into office groups (process pool entry point)"""
+    contests = process_openelections_csv(file_path, year)
+    return group_contests_by_office(contests)
+
+
+def process_years(year_files, workers=1):
+    """
+    Process (file_path, year) pairs, spreading them across a process pool when workers > 1
+    
+    Falls back to serial processing if the pool cannot be started or breaks.
+    Returns office groups keyed by year in the order the pairs were given.
+    """
+    results = {}
+    
+    if workers > 1 and len(year_files) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(year_files))) as executor:
+                futures = {year: executor.submit(process_year, file_path, year) for file_path, year in year_files}
+                for year, future in futures.items():
+                    results[year] = future.result()
+            return results
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"  ⚠ Process pool unavailable ({e}), falling back to serial processing")
+            results = {}
+    
+    for file_path, year in year_files:
+        results[year] = process_year(file_path, year)
+    
+    return results
+
+
+def file_content_hash(file_path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cached_year(cache_dir, year, source_hash):
+    """Return cached office groups for a year, or None if missing or stale"""
+    cache_file = cache_dir / f"{year}.json"
+    if not cache_file.exists():
+        return None
+    
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if entry.get('source_hash') != source_hash or entry.get('transformer_version') != TRANSFORMER_VERSION:
+        return None
+    
+    return entry.get('office_groups')
+
+
+def save_cached_year(cache_dir, year, source_hash, office_groups):
+    """Store a year's processed office groups keyed by input hash and transformer version"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entry = {
+        'year': year,
+        'source_hash': source_hash,
+        'transformer_version': TRANSFORMER_VERSION,
+        'office_groups': office_groups
+    }
+    with open(cache_dir / f"{year}.json", 'w', encoding='utf-8') as f:
+        json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def office_slug(office):
+    """File-system friendly name for an office, e.g. 'U.S. Senate' -> 'u_s_senate'"""
+    return re.sub(r'[^a-z0-9]+', '_', str(office).lower()).strip('_')
+
+
+def write_sharded_output(shard_dir, metadata, results_by_year):
+    """
+    Write one compact JSON shard per year/office plus a manifest
+    
+    The manifest lists every year, office, contest key and shard path (relative to
+    shard_dir) along with the competitiveness palette, so the page can fetch only
+    the shards the current view needs.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    
+    manifest = {
+        "metadata": metadata,
+        "competitiveness_palette": COMPETITIVENESS_PALETTE,
+        "years": {}
+    }
+    written = set()
+    
+    for year, office_groups in results_by_year.items():
+        year_dir = shard_dir / year
+        year_dir.mkdir(exist_ok=True)
+        manifest["years"][year] = {}
+        
+        for office, contests in office_groups.items():
+            shard_path = year_dir / f"{office_slug(office)}.json"
+            shard = {
+                "year": year,
+                "office": office,
+                "contests": contests
+            }
+            with open(shard_path, 'w', encoding='utf-8') as f:
+                json.dump(shard, f, ensure_ascii=False, separators=(',', ':'))
+            written.add(shard_path)
             
-            if county_results:
-                contests[contest_key] = {
-                    'contest_name': contest_key,
-                    'office': office,
-                    'district': str(district) if district else '',
-                    'results': county_results
-                }
+            manifest["years"][year][office] = {
+                "path": shard_path.relative_to(shard_dir).as_posix(),
+                "contests": list(contests.keys())
+            }
     
-    print(f"  ✓ Processed {len(contests)} contest(s)")
-    return contests
+    # Drop shards left over from years or offices that no longer exist
+    for stale in shard_dir.glob("*/*.json"):
+        if stale not in written:
+            stale.unlink()
+    
+    manifest_path = shard_dir / "manifest.json"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    
+    print(f"Wrote {len(written)} shard(s) and manifest to: {shard_dir}")
 
 
-def transform_all_data():
-    """Transform all Ohio election data into nested JSON format"""
+def transform_all_data(use_cache=True, workers=1, shards=False, columnar=False):
+    """
+    Transform all Ohio election data into nested JSON format
+    
+    Each year's processed contests are cached in data/.transform_cache, keyed on the
+    consolidated file's content hash and TRANSFORMER_VERSION, so only changed years
+    are recomputed before the final document is re-spliced. With workers > 1 the
+    remaining years are processed in a process pool. With shards=True, compact
+    per-year/per-office files and a manifest are also written to data/results.
+    With columnar=True, a dictionary-encoded copy is written alongside the main file.
+    """
     
     base_dir = Path(__file__).parent.parent / "data"
     output_file = base_dir / "ohio_election_results.json"
+    cache_dir = base_dir / ".transform_cache"
     
     # Look for consolidated OpenElections format files
     consolidated_files = list(base_dir.glob("*__oh__general__consolidated.csv"))
@@ -250,40 +397,62 @@ def transform_all_data():
     # Initialize results structure
     results_by_year = {}
     
-    # Process each year's data
+    # Reuse cached contests for years whose input file is unchanged
+    source_hashes = {}
+    pending = []
     for year in years:
         year_str = str(year)
-        file_path = year_file_map[year_str]
-        
-        # Process the OpenElections format file
-        contests = process_openelections_csv(file_path, year_str)
-        
-        # Organize by office type
-        office_groups = {}
-        for contest_key, contest_data in contests.items():
-            office = contest_data['office']
-            
-            if office not in office_groups:
-                office_groups[office] = {}
-            
-            office_groups[office][contest_key] = contest_data
+        source_hashes[year_str] = file_content_hash(year_file_map[year_str])
         
+        office_groups = load_cached_year(cache_dir, year_str, source_hashes[year_str]) if use_cache else None
+        if office_groups is not None:
+            print(f"Using cached results for {year_str}")
+            results_by_year[year_str] = office_groups
+        else:
+            pending.append(year_str)
+    
+    # Process the remaining OpenElections format files
+    processed = process_years([(year_file_map[y], y) for y in pending], workers)
+    for year_str, office_groups in processed.items():
+        save_cached_year(cache_dir, year_str, source_hashes[year_str], office_groups)
         results_by_year[year_str] = office_groups
     
+    # Keep year order deterministic regardless of cache hits or worker completion order
+    results_by_year = {str(y): results_by_year[str(y)] for y in years}
+    rebuilt_years = [int(y) for y in pending]
+    
     # Combine into final structure
     final_output = {
         "metadata": metadata,
+        "competitiveness_palette": COMPETITIVENESS_PALETTE,
         "results_by_year": results_by_year
     }
     
     # Write to JSON file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(final_output, f, indent=2, ensure_ascii=False)
+    with stage('json_write', file=output_file):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(final_output, f, indent=2, ensure_ascii=False)
+    
+    if columnar:
+        columnar_file = base_dir / "ohio_election_results.columnar.json"
+        write_columnar_results(final_output, columnar_file)
+        print(f"Columnar output saved to: {columnar_file}")
+    
+    if shards:
+        write_sharded_output(base_dir / "results", metadata, results_by_year)
     
     print(f"\nTransformation complete!")
     print(f"Output saved to: {output_file}")
     print(f"Years processed: {years}")
+    print(f"Years rebuilt: {rebuilt_years if rebuilt_years else 'none (all cached)'}")
 
 
 if __name__ == "__main__":
-    transform_all_data()
+    parser = argparse.ArgumentParser(description="Transform consolidated Ohio election CSVs into nested JSON")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore the per-year build cache and reprocess every year")
+    parser.add_argument('--workers', type=int, default=1, help="Number of worker processes for year processing (default: 1, serial)")
+    parser.add_argument('--shards', action='store_true', help="Also write per-year/per-office shards and a manifest to data/results")
+    parser.add_argument('--columnar', action='store_true', help="Also write the dictionary-encoded data/ohio_election_results.columnar.json")
+    args = parser.parse_args()
+    
+    transform_all_data(use_cache=not args.no_cache, workers=args.workers, shards=args.shards, columnar=args.columnar)